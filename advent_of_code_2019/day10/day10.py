@@ -103,8 +103,12 @@ Here are some larger examples:
 Find the best location for a new monitoring station. How many other asteroids can be detected from that location?
 """
 
-from typing import List, Dict, NamedTuple, Tuple, Iterator
+from typing import List, NamedTuple, Optional, Tuple, Iterator
+from concurrent.futures import ProcessPoolExecutor
+import functools
 import math
+import multiprocessing
+import os
 
 class Asteroid(NamedTuple):
     x: int
@@ -120,24 +124,50 @@ def parse(raw: str) -> Asteroids:
         if c == '#'
     ]
 
-def count_visible(asteroids: Asteroids, station: Asteroid) -> int:
-    #recenter
-    slopes = set()
-    for x, y in asteroids:
-        dx = x - station.x
-        dy = y - station.y
-
-        gcd = math.gcd(dx, dy)
+def direction(dx: int, dy: int) -> Tuple[int, int]:
+    """
+    the smallest whole step along (dx, dy); asteroids in line from the
+    station share it exactly, however far away they are
+    """
+    gcd = math.gcd(dx, dy)
+    return dx // gcd, dy // gcd
 
-        if dx == dy == 0:
-            pass
-        else: 
-            slopes.add((dx / gcd, dy / gcd))
-
-    return len(slopes) 
-
-def best_station(asteroids: Asteroids) -> Tuple[Asteroid, int]:
-    results = [(a, count_visible(asteroids, a)) for a in asteroids]
+def count_visible(asteroids: Asteroids, station: Asteroid) -> int:
+    sx, sy = station
+    return len({direction(x - sx, y - sy) for x, y in asteroids if (x, y) != (sx, sy)})
+
+# fields with at least this many asteroids are counted in parallel
+PARALLEL_FIELD = 2000
+
+_field: Asteroids = []
+
+def _start_worker(asteroids: Asteroids) -> None:
+    global _field
+    _field = asteroids
+
+def _count_chunk(stations: Asteroids) -> List[int]:
+    return [count_visible(_field, station) for station in stations]
+
+def visible_counts(asteroids: Asteroids, workers: Optional[int] = None) -> List[int]:
+    """
+    count_visible for every asteroid as the station. Big fields are split
+    into chunks of stations over a process pool (one worker per core by
+    default); each worker is handed the field once, when it starts.
+    """
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(asteroids) >= PARALLEL_FIELD else 1
+    if workers == 1:
+        return [count_visible(asteroids, station) for station in asteroids]
+
+    size = -(-len(asteroids) // (4 * workers))
+    chunks = [asteroids[i:i + size] for i in range(0, len(asteroids), size)]
+    context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+    with ProcessPoolExecutor(workers, mp_context=context,
+                             initializer=_start_worker, initargs=(asteroids,)) as executor:
+        return [count for counts in executor.map(_count_chunk, chunks) for count in counts]
+
+def best_station(asteroids: Asteroids, workers: Optional[int] = None) -> Tuple[Asteroid, int]:
+    results = zip(asteroids, visible_counts(asteroids, workers))
     return max(results, key = lambda pair: pair[1])
 
 RAW = """.#..#
@@ -241,56 +271,39 @@ The Elves are placing bets on which will be the 200th asteroid to be vaporized.
 
 from collections import defaultdict
 
-def faux_angle(asteroid):
-    dx, dy = asteroid
-    if dx == 0 and dy < 0:
-        # e.g. (0, -1), straight up
-        return (0, 0)
-    elif dx > 0 and dy < 0:
-        # e.g. (0.1, -0.9) or (0.9, -0.1)
-        return (1, dx / abs(dy))
-    elif dx > 0 and dy == 0:
-        return (2, 0)
-    elif dx > 0 and dy > 0:
-        # e.g. (0.9, 0.1) or (0.1, 0.9)
-        return (3, dy / dx)
-    elif dx == 0 and dy > 0:
-        return (4, 0)
-    elif dx < 0 and dy > 0:
-        return (5, abs(dx) / dy)
-    elif dx < 0 and dy == 0:
-        return (6, 0)
-    elif dx < 0 and dy < 0:
-        return (7, dy / dx)
-
-def iterate( asteroids: Asteroids, station: Asteroid) -> Iterator[Asteroid]:
+def clockwise(a: Tuple[int, int], b: Tuple[int, int]) -> int:
+    """
+    compares directions by the laser's sweep, clockwise from straight up
+    (y grows downwards), exactly: first by which half they're in, the
+    right one from straight up or the left one from straight down, then
+    by the sign of their cross product
+    """
+    half_a = 0 if a[0] > 0 or (a[0] == 0 and a[1] < 0) else 1
+    half_b = 0 if b[0] > 0 or (b[0] == 0 and b[1] < 0) else 1
+    if half_a != half_b:
+        return half_a - half_b
+    return b[0] * a[1] - a[0] * b[1]
+
+def iterate(asteroids: Asteroids, station: Asteroid) -> Iterator[Asteroid]:
+    """
+    the asteroids in the order the laser vaporizes them, lazily: directions
+    are sorted once, then each turn takes the nearest asteroid left in each
+    """
     asteroids_by_angle = defaultdict(list)
-
     for x, y in asteroids:
-        dx = x - station.x
-        dy = y - station.y
-
-        gcd = math.gcd(dx, dy)
-
-        if dx == dy == 0:
-            pass
-        else:
-            angle = (dx / gcd, dy / gcd)
-            asteroids_by_angle[angle].append(Asteroid(x, y))
+        if (x, y) != station:
+            asteroids_by_angle[direction(x - station.x, y - station.y)].append(Asteroid(x, y))
 
     # sort by length descending for each angle
     for angle_asteroids in asteroids_by_angle.values():
         angle_asteroids.sort(key = lambda a: abs(a.x - station.x) + abs(a.y - station.y), reverse = True)
 
-    while asteroids_by_angle:
-        keys = asteroids_by_angle.keys() # (dx, dy)
-        keys = sorted(keys, key = faux_angle)
-
-        for key in keys:
-            angle_asteroids = asteroids_by_angle[key]
+    turn = [asteroids_by_angle[angle]
+            for angle in sorted(asteroids_by_angle, key = functools.cmp_to_key(clockwise))]
+    while turn:
+        for angle_asteroids in turn:
             yield angle_asteroids.pop()
-            if not angle_asteroids:
-                del asteroids_by_angle[key]
+        turn = [angle_asteroids for angle_asteroids in turn if angle_asteroids]
 
 NEW_ASTEROIDS = parse(""".#....#####...#..
 ##...##.#####..##
@@ -300,6 +313,8 @@ NEW_ASTEROIDS = parse(""".#....#####...#..
 
 NEW_STATION = Asteroid(8, 3)
 
+assert list(iterate(NEW_ASTEROIDS, NEW_STATION))[:3] == [Asteroid(8, 1), Asteroid(9, 0), Asteroid(9, 1)]
+
 #for asteroid in iterate(NEW_ASTEROIDS, NEW_STATION):
 #    print(asteroid)
 
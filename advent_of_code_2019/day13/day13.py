@@ -21,188 +21,15 @@ from enum import Enum
 import itertools
 from collections import deque, defaultdict
 import logging
+import os
+import sys
 
 
 logging.basicConfig(level=logging.INFO)
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from intcode import IntcodeComputer, EndProgram, Program
 
-class Opcode(Enum):
-    ADD = 1
-    MULTIPLY = 2
-    STORE_INPUT = 3
-    SEND_TO_OUTPUT = 4
-    JUMP_IF_TRUE = 5
-    JUMP_IF_FALSE = 6
-    LESS_THAN = 7
-    EQUALS = 8
-    ADJUST_RELATIVE_BASE = 9
-
-    END_PROGRAM = 99
-
-
-Modes = List[int]
-Program = List[int]
-
-
-class EndProgram(Exception): pass
-
-
-def parse_opcode(opcode: int, num_modes: int = 3) -> Tuple[Opcode, Modes]:
-    logging.debug(f"parsing {opcode}")
-
-    opcode_part = opcode % 100
-
-    modes: List[int] = []
-    opcode = opcode // 100
-
-    for _ in range(num_modes):
-        modes.append(opcode % 10)
-        opcode = opcode // 10
-
-    return Opcode(opcode_part), modes
-
-
-class IntcodeComputer:
-    def __init__(self, program: List[int]) -> None:
-        self.program = defaultdict(int)
-        self.program.update({i: value for i, value in enumerate(program)})
-        self.inputs = deque()
-        self.pos = 0
-        self.relative_base = 0
-
-    def _get_value(self, pos: int, mode: int) -> int:
-        if mode == 0:
-            # pointer mode
-            logging.debug(f"pos: {pos}, mode: {mode}, value: {self.program[self.program[pos]]}")
-            return self.program[self.program[pos]]
-        elif mode == 1:
-            # immediate mode
-            logging.debug(f"pos: {pos}, mode: {mode}, value: {self.program[pos]}")
-            return self.program[pos]
-        elif mode == 2:
-            # relative mode
-            logging.debug(f"pos: {pos}, mode: {mode}, value: {self.program[self.program[pos] + self.relative_base]}")
-            return self.program[self.program[pos] + self.relative_base]
-        else:
-            raise ValueError(f"unknown mode: {mode}")
-
-    def _loc(self, pos: int, mode: int) -> int:
-        if mode == 0:
-            # pointer mode
-            logging.debug(f"pos: {pos}, mode: {mode}, value: {self.program[pos]}")
-            return self.program[pos]
-        elif mode == 2:
-            # relative mode
-            logging.debug(f"pos: {pos}, mode: {mode}, value: {self.program[pos] + self.relative_base}")
-            return self.program[pos] + self.relative_base
-
-    def __call__(self, input_values: Iterable[int] = ()) -> int:
-        self.inputs.extend(input_values)
-
-        while True:
-            logging.debug(f"program: {self.program}")
-            logging.debug(f"pos: {self.pos}, inputs: {self.inputs}, relative_base: {self.relative_base}")
-
-            opcode, modes = parse_opcode(self.program[self.pos])
-
-            logging.debug(f"opcode: {opcode}, modes: {modes}")
-
-            if opcode == Opcode.END_PROGRAM:
-                raise EndProgram
-
-            elif opcode == Opcode.ADD:
-                value1 = self._get_value(self.pos + 1, modes[0])
-                value2 = self._get_value(self.pos + 2, modes[1])
-                loc = self._loc(self.pos + 3, modes[2])
-
-                logging.debug(f"value1: {value1}, value2: {value2}, loc: {loc}")
-
-                self.program[loc] = value1 + value2
-                self.pos += 4
-
-            elif opcode == Opcode.MULTIPLY:
-                value1 = self._get_value(self.pos + 1, modes[0])
-                value2 = self._get_value(self.pos + 2, modes[1])
-                loc = self._loc(self.pos + 3, modes[2])
-
-                logging.debug(f"value1: {value1}, value2: {value2}, loc: {loc}")
-
-                self.program[loc] = value1 * value2
-                self.pos += 4
-
-            elif opcode == Opcode.STORE_INPUT:
-                # Get input and store at location
-                loc = self._loc(self.pos + 1, modes[0])
-                input_value = self.inputs.popleft()
-                self.program[loc] = input_value
-                self.pos += 2
-
-            elif opcode == Opcode.SEND_TO_OUTPUT:
-                # Get output from location
-                value = self._get_value(self.pos + 1, modes[0])
-                self.pos += 2
-                logging.debug(f"output: {value}")
-                return value
-
-            elif opcode == Opcode.JUMP_IF_TRUE:
-                # jump if true
-                value1 = self._get_value(self.pos + 1, modes[0])
-                value2 = self._get_value(self.pos + 2, modes[1])
-
-                logging.debug(f"value1: {value1}, value2: {value2}")
-
-                if value1 != 0:
-                    self.pos = value2
-                else:
-                    self.pos += 3
-
-            elif opcode == Opcode.JUMP_IF_FALSE:
-                value1 = self._get_value(self.pos + 1, modes[0])
-                value2 = self._get_value(self.pos + 2, modes[1])
-
-                logging.debug(f"value1: {value1}, value2: {value2}")
-
-                if value1 == 0:
-                    self.pos = value2
-                else:
-                    self.pos += 3
-
-            elif opcode == Opcode.LESS_THAN:
-                value1 = self._get_value(self.pos + 1, modes[0])
-                value2 = self._get_value(self.pos + 2, modes[1])
-                loc = self._loc(self.pos + 3, modes[2])
-
-                logging.debug(f"value1: {value1}, value2: {value2}, loc: {loc}")
-
-                if value1 < value2:
-                    self.program[loc] = 1
-                else:
-                    self.program[loc] = 0
-                self.pos += 4
-
-            elif opcode == Opcode.EQUALS:
-                value1 = self._get_value(self.pos + 1, modes[0])
-                value2 = self._get_value(self.pos + 2, modes[1])
-                loc = self._loc(self.pos + 3, modes[2])
-
-                logging.debug(f"value1: {value1}, value2: {value2}, loc: {loc}")
-
-                if value1 == value2:
-                    self.program[loc] = 1
-                else:
-                    self.program[loc] = 0
-                self.pos += 4
-
-            elif opcode == Opcode.ADJUST_RELATIVE_BASE:
-                value = self._get_value(self.pos + 1, modes[0])
-
-                logging.debug(f"value: {value}")
-
-                self.relative_base += value
-                self.pos += 2
-
-            else:
-                raise ValueError(f"invalid opcode: {opcode}")
 
 class Tile(Enum):
     EMPTY = 0
@@ -45,226 +45,23 @@ Run your ASCII program. What is the sum of the alignment parameters for the scaf
 
 program = [1,330,331,332,109,3376,1101,1182,0,16,1102,1,1449,24,101,0,0,570,1006,570,36,1001,571,0,0,1001,570,-1,570,1001,24,1,24,1105,1,18,1008,571,0,571,1001,16,1,16,1008,16,1449,570,1006,570,14,21102,1,58,0,1106,0,786,1006,332,62,99,21101,0,333,1,21101,0,73,0,1105,1,579,1101,0,0,572,1101,0,0,573,3,574,101,1,573,573,1007,574,65,570,1005,570,151,107,67,574,570,1005,570,151,1001,574,-64,574,1002,574,-1,574,1001,572,1,572,1007,572,11,570,1006,570,165,101,1182,572,127,1002,574,1,0,3,574,101,1,573,573,1008,574,10,570,1005,570,189,1008,574,44,570,1006,570,158,1105,1,81,21102,1,340,1,1105,1,177,21102,477,1,1,1105,1,177,21102,1,514,1,21101,176,0,0,1105,1,579,99,21102,184,1,0,1105,1,579,4,574,104,10,99,1007,573,22,570,1006,570,165,102,1,572,1182,21102,1,375,1,21102,211,1,0,1105,1,579,21101,1182,11,1,21102,222,1,0,1105,1,979,21101,388,0,1,21102,233,1,0,1106,0,579,21101,1182,22,1,21102,1,244,0,1105,1,979,21101,401,0,1,21101,0,255,0,1105,1,579,21101,1182,33,1,21102,1,266,0,1106,0,979,21102,414,1,1,21102,1,277,0,1105,1,579,3,575,1008,575,89,570,1008,575,121,575,1,575,570,575,3,574,1008,574,10,570,1006,570,291,104,10,21102,1,1182,1,21101,0,313,0,1106,0,622,1005,575,327,1101,0,1,575,21101,0,327,0,1106,0,786,4,438,99,0,1,1,6,77,97,105,110,58,10,33,10,69,120,112,101,99,116,101,100,32,102,117,110,99,116,105,111,110,32,110,97,109,101,32,98,117,116,32,103,111,116,58,32,0,12,70,117,110,99,116,105,111,110,32,65,58,10,12,70,117,110,99,116,105,111,110,32,66,58,10,12,70,117,110,99,116,105,111,110,32,67,58,10,23,67,111,110,116,105,110,117,111,117,115,32,118,105,100,101,111,32,102,101,101,100,63,10,0,37,10,69,120,112,101,99,116,101,100,32,82,44,32,76,44,32,111,114,32,100,105,115,116,97,110,99,101,32,98,117,116,32,103,111,116,58,32,36,10,69,120,112,101,99,116,101,100,32,99,111,109,109,97,32,111,114,32,110,101,119,108,105,110,101,32,98,117,116,32,103,111,116,58,32,43,10,68,101,102,105,110,105,116,105,111,110,115,32,109,97,121,32,98,101,32,97,116,32,109,111,115,116,32,50,48,32,99,104,97,114,97,99,116,101,114,115,33,10,94,62,118,60,0,1,0,-1,-1,0,1,0,0,0,0,0,0,1,20,24,0,109,4,1201,-3,0,586,21002,0,1,-1,22101,1,-3,-3,21102,1,0,-2,2208,-2,-1,570,1005,570,617,2201,-3,-2,609,4,0,21201,-2,1,-2,1106,0,597,109,-4,2105,1,0,109,5,2102,1,-4,630,20102,1,0,-2,22101,1,-4,-4,21102,1,0,-3,2208,-3,-2,570,1005,570,781,2201,-4,-3,653,20101,0,0,-1,1208,-1,-4,570,1005,570,709,1208,-1,-5,570,1005,570,734,1207,-1,0,570,1005,570,759,1206,-1,774,1001,578,562,684,1,0,576,576,1001,578,566,692,1,0,577,577,21101,702,0,0,1105,1,786,21201,-1,-1,-1,1105,1,676,1001,578,1,578,1008,578,4,570,1006,570,724,1001,578,-4,578,21102,1,731,0,1105,1,786,1106,0,774,1001,578,-1,578,1008,578,-1,570,1006,570,749,1001,578,4,578,21102,1,756,0,1105,1,786,1106,0,774,21202,-1,-11,1,22101,1182,1,1,21101,0,774,0,1105,1,622,21201,-3,1,-3,1105,1,640,109,-5,2105,1,0,109,7,1005,575,802,21002,576,1,-6,21002,577,1,-5,1105,1,814,21102,1,0,-1,21101,0,0,-5,21102,1,0,-6,20208,-6,576,-2,208,-5,577,570,22002,570,-2,-2,21202,-5,41,-3,22201,-6,-3,-3,22101,1449,-3,-3,2102,1,-3,843,1005,0,863,21202,-2,42,-4,22101,46,-4,-4,1206,-2,924,21102,1,1,-1,1105,1,924,1205,-2,873,21101,0,35,-4,1105,1,924,1202,-3,1,878,1008,0,1,570,1006,570,916,1001,374,1,374,2101,0,-3,895,1101,0,2,0,2102,1,-3,902,1001,438,0,438,2202,-6,-5,570,1,570,374,570,1,570,438,438,1001,578,558,921,21002,0,1,-4,1006,575,959,204,-4,22101,1,-6,-6,1208,-6,41,570,1006,570,814,104,10,22101,1,-5,-5,1208,-5,47,570,1006,570,810,104,10,1206,-1,974,99,1206,-1,974,1102,1,1,575,21101,0,973,0,1105,1,786,99,109,-7,2105,1,0,109,6,21102,1,0,-4,21101,0,0,-3,203,-2,22101,1,-3,-3,21208,-2,82,-1,1205,-1,1030,21208,-2,76,-1,1205,-1,1037,21207,-2,48,-1,1205,-1,1124,22107,57,-2,-1,1205,-1,1124,21201,-2,-48,-2,1106,0,1041,21101,-4,0,-2,1106,0,1041,21102,-5,1,-2,21201,-4,1,-4,21207,-4,11,-1,1206,-1,1138,2201,-5,-4,1059,2101,0,-2,0,203,-2,22101,1,-3,-3,21207,-2,48,-1,1205,-1,1107,22107,57,-2,-1,1205,-1,1107,21201,-2,-48,-2,2201,-5,-4,1090,20102,10,0,-1,22201,-2,-1,-2,2201,-5,-4,1103,2102,1,-2,0,1105,1,1060,21208,-2,10,-1,1205,-1,1162,21208,-2,44,-1,1206,-1,1131,1105,1,989,21101,439,0,1,1105,1,1150,21101,0,477,1,1105,1,1150,21102,514,1,1,21102,1149,1,0,1105,1,579,99,21102,1157,1,0,1106,0,579,204,-2,104,10,99,21207,-3,22,-1,1206,-1,1138,2102,1,-5,1176,2102,1,-4,0,109,-6,2105,1,0,22,11,30,1,9,1,30,1,9,1,30,1,9,1,30,1,9,1,30,1,9,1,30,1,9,5,26,1,13,1,26,1,13,1,26,1,13,1,10,5,5,7,13,1,10,1,3,1,5,1,19,1,10,1,3,1,5,1,11,13,6,1,3,1,5,1,11,1,7,1,3,12,5,1,11,1,7,1,3,2,5,1,9,1,11,1,7,1,3,2,5,1,7,5,9,1,7,6,5,1,7,1,1,1,1,1,9,1,12,1,5,1,7,1,1,1,1,1,9,1,12,1,5,1,7,1,1,1,1,1,9,1,12,13,1,1,1,1,1,1,9,1,18,1,5,1,1,1,1,1,1,1,9,1,18,11,1,11,24,1,1,1,36,11,30,1,1,1,1,1,26,5,5,1,1,1,1,13,14,1,3,1,5,1,1,1,13,1,14,1,3,1,5,1,1,1,13,1,14,1,3,1,5,1,1,1,13,1,14,13,13,1,18,1,5,1,15,1,18,1,5,1,15,11,8,1,5,1,25,1,8,1,5,1,25,1,8,1,5,1,25,1,8,7,25,1,40,1,40,1,40,1,40,1,40,1,34,7,34,1,40,1,40,1,40,1,10]
 
-from typing import List, NamedTuple, Tuple, Iterable, Set, Dict, Callable
+from typing import List, NamedTuple, Tuple, Iterable, Set, Dict, Callable, Optional
 from enum import Enum
 import itertools
 from collections import deque, defaultdict
 import logging
-import copy
+import os
+import sys
 
 
 logging.basicConfig(level=logging.INFO)
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from intcode import IntcodeComputer
+from intcode.ascii import Terminal
 
-class Opcode(Enum):
-    ADD = 1
-    MULTIPLY = 2
-    STORE_INPUT = 3
-    SEND_TO_OUTPUT = 4
-    JUMP_IF_TRUE = 5
-    JUMP_IF_FALSE = 6
-    LESS_THAN = 7
-    EQUALS = 8
-    ADJUST_RELATIVE_BASE = 9
 
-    END_PROGRAM = 99
-
-
-Modes = List[int]
-Program = List[int]
-
-
-class EndProgram(Exception): pass
-
-
-def parse_opcode(opcode: int, num_modes: int = 3) -> Tuple[Opcode, Modes]:
-    # logging.debug(f"parsing {opcode}")
-
-    opcode_part = opcode % 100
-
-    modes: List[int] = []
-    opcode = opcode // 100
-
-    for _ in range(num_modes):
-        modes.append(opcode % 10)
-        opcode = opcode // 10
-
-    return Opcode(opcode_part), modes
-
-
-class IntcodeComputer:
-    def __init__(self, program: List[int], get_input: Callable[[], int]) -> None:
-        self.program = defaultdict(int)
-        self.program.update({i: value for i, value in enumerate(program)})
-        self.get_input = get_input
-        self.pos = 0
-        self.relative_base = 0
-
-    def save(self):
-        return [
-            copy.deepcopy(self.program),
-            self.get_input,
-            self.pos,
-            self.relative_base
-        ]
-
-    @staticmethod
-    def load(program, get_input, pos, relative_base):
-        computer = IntcodeComputer([], get_input)
-        computer.program = program
-        computer.pos = pos
-        computer.relative_base = relative_base
-        return computer
-
-    def _get_value(self, pos: int, mode: int) -> int:
-        if mode == 0:
-            # pointer mode
-            # logging.debug(f"pos: {pos}, mode: {mode}, value: {self.program[self.program[pos]]}")
-            return self.program[self.program[pos]]
-        elif mode == 1:
-            # immediate mode
-            # logging.debug(f"pos: {pos}, mode: {mode}, value: {self.program[pos]}")
-            return self.program[pos]
-        elif mode == 2:
-            # relative mode
-            # logging.debug(f"pos: {pos}, mode: {mode}, value: {self.program[self.program[pos] + self.relative_base]}")
-            return self.program[self.program[pos] + self.relative_base]
-        else:
-            raise ValueError(f"unknown mode: {mode}")
-
-    def _loc(self, pos: int, mode: int) -> int:
-        if mode == 0:
-            # pointer mode
-            # logging.debug(f"pos: {pos}, mode: {mode}, value: {self.program[pos]}")
-            return self.program[pos]
-        elif mode == 2:
-            # relative mode
-            # logging.debug(f"pos: {pos}, mode: {mode}, value: {self.program[pos] + self.relative_base}")
-            return self.program[pos] + self.relative_base
-
-    def go(self) -> int:
-
-        while True:
-            # logging.debug(f"program: {self.program}")
-            # logging.debug(f"pos: {self.pos}, inputs: {self.inputs}, relative_base: {self.relative_base}")
-
-            opcode, modes = parse_opcode(self.program[self.pos])
-
-            # logging.debug(f"opcode: {opcode}, modes: {modes}")
-
-            if opcode == Opcode.END_PROGRAM:
-                raise EndProgram
-
-            elif opcode == Opcode.ADD:
-                value1 = self._get_value(self.pos + 1, modes[0])
-                value2 = self._get_value(self.pos + 2, modes[1])
-                loc = self._loc(self.pos + 3, modes[2])
-
-                # logging.debug(f"value1: {value1}, value2: {value2}, loc: {loc}")
-
-                self.program[loc] = value1 + value2
-                self.pos += 4
-
-            elif opcode == Opcode.MULTIPLY:
-                value1 = self._get_value(self.pos + 1, modes[0])
-                value2 = self._get_value(self.pos + 2, modes[1])
-                loc = self._loc(self.pos + 3, modes[2])
-
-                # logging.debug(f"value1: {value1}, value2: {value2}, loc: {loc}")
-
-                self.program[loc] = value1 * value2
-                self.pos += 4
-
-            elif opcode == Opcode.STORE_INPUT:
-                # Get input and store at location
-                loc = self._loc(self.pos + 1, modes[0])
-                input_value = self.get_input()
-                self.program[loc] = input_value
-                self.pos += 2
-
-            elif opcode == Opcode.SEND_TO_OUTPUT:
-                # Get output from location
-                value = self._get_value(self.pos + 1, modes[0])
-                self.pos += 2
-                # logging.debug(f"output: {value}")
-
-                ####
-                ####
-
-                return value
-
-            elif opcode == Opcode.JUMP_IF_TRUE:
-                # jump if true
-                value1 = self._get_value(self.pos + 1, modes[0])
-                value2 = self._get_value(self.pos + 2, modes[1])
-
-                # logging.debug(f"value1: {value1}, value2: {value2}")
-
-                if value1 != 0:
-                    self.pos = value2
-                else:
-                    self.pos += 3
-
-            elif opcode == Opcode.JUMP_IF_FALSE:
-                value1 = self._get_value(self.pos + 1, modes[0])
-                value2 = self._get_value(self.pos + 2, modes[1])
-
-                # logging.debug(f"value1: {value1}, value2: {value2}")
-
-                if value1 == 0:
-                    self.pos = value2
-                else:
-                    self.pos += 3
-
-            elif opcode == Opcode.LESS_THAN:
-                value1 = self._get_value(self.pos + 1, modes[0])
-                value2 = self._get_value(self.pos + 2, modes[1])
-                loc = self._loc(self.pos + 3, modes[2])
-
-                # logging.debug(f"value1: {value1}, value2: {value2}, loc: {loc}")
-
-                if value1 < value2:
-                    self.program[loc] = 1
-                else:
-                    self.program[loc] = 0
-                self.pos += 4
-
-            elif opcode == Opcode.EQUALS:
-                value1 = self._get_value(self.pos + 1, modes[0])
-                value2 = self._get_value(self.pos + 2, modes[1])
-                loc = self._loc(self.pos + 3, modes[2])
-
-                # logging.debug(f"value1: {value1}, value2: {value2}, loc: {loc}")
-
-                if value1 == value2:
-                    self.program[loc] = 1
-                else:
-                    self.program[loc] = 0
-                self.pos += 4
-
-            elif opcode == Opcode.ADJUST_RELATIVE_BASE:
-                value = self._get_value(self.pos + 1, modes[0])
-
-                # logging.debug(f"value: {value}")
-
-                self.relative_base += value
-                self.pos += 2
-
-            else:
-                raise ValueError(f"invalid opcode: {opcode}")
-
-computer = IntcodeComputer(program, lambda: 0)
-
-output = []
-
-try:
-    while True:
-        output.append(computer.go())
-except EndProgram:
-    pass
-
-s = [chr(i) for i in output]
-text = ''.join(s).strip()
+text = Terminal(IntcodeComputer(program)).read().strip()
 lines = [line for line in text.split("\n")]
 
 def sum_of_alignment_parameters(lines: List[str]) -> int:
@@ -412,46 +209,146 @@ After visiting every part of the scaffold at least once, how much dust does the
 ..............................#..........
 """
 
-#L10, L12, R6, 
-#R10, L4, L4, L12, 
-#L10, L12, R6, 
-#R10, L4, L4, L12, 
-#L10, L12, R6, 
-#L10, R10, R6, L4, 
-#R10, L4, L4, L12, 
-#L10, R10, R6, L4, 
-#L10, L12, R6, 
-#L10, R10, R6, L4
-
-# A, B, A, B, A, C, B, C, A, C
-
-# A: L10, L12, R6
-# B: R10, L4, L4, L12
-# C: L10, R10, R6, L4
-
-raw_input = """A,B,A,B,A,C,B,C,A,C
-L,10,L,12,R,6
-R,10,L,4,L,4,L,12
-L,10,R,10,R,6,L,4
-n
-"""
+# the robot faces (dx, dy) for each of its symbols; turning left from
+# (dx, dy) faces (dy, -dx), turning right faces (-dy, dx)
+FACING = {'^': (0, -1), 'v': (0, 1), '<': (-1, 0), '>': (1, 0)}
+
+
+def scaffold_path(lines: List[str]) -> List[str]:
+    """
+    walk the scaffold from the robot: go straight for as long as possible,
+    then turn whichever way the scaffold goes, until it ends. Returns the
+    moves as "L,10"-style turn and distance pairs. A robot already facing
+    along the scaffold starts with a bare distance, and one facing away
+    from it with an extra turn.
+    """
+    def scaffold(x: int, y: int) -> bool:
+        return 0 <= y < len(lines) and 0 <= x < len(lines[y]) and lines[y][x] == '#'
+
+    (x, y), (dx, dy) = next(((x, y), FACING[char])
+                            for y, line in enumerate(lines)
+                            for x, char in enumerate(line)
+                            if char in FACING)
+    moves = []
+
+    def forward() -> int:
+        nonlocal x, y
+        distance = 0
+        while scaffold(x + dx, y + dy):
+            x, y = x + dx, y + dy
+            distance += 1
+        return distance
+
+    distance = forward()
+    if distance:
+        moves.append(str(distance))
+    elif scaffold(x - dx, y - dy) and not scaffold(x + dy, y - dx) and not scaffold(x - dy, y + dx):
+        # the scaffold is behind: turn once here, and again below
+        moves.append('R')
+        dx, dy = -dy, dx
 
-ascii_input = [ord(c) for c in raw_input]
+    while True:
+        if scaffold(x + dy, y - dx):
+            turn, (dx, dy) = 'L', (dy, -dx)
+        elif scaffold(x - dy, y + dx):
+            turn, (dx, dy) = 'R', (-dy, dx)
+        else:
+            return moves
+
+        moves.append(f"{turn},{forward()}")
+
+
+Routine = Tuple[List[int], List[Tuple[str, ...]]]
+
+
+def compress(moves: List[str], num_functions: int = 3, limit: int = 20) -> Routine:
+    """
+    split moves into a main routine (function indexes) and at most
+    num_functions functions, each at most limit characters as text.
+
+    Depth first along the moves: at each point either call a function that
+    the remaining moves start with, or, if there's a function left to
+    define, define it as the next 1, 2, ... moves, stopping once it would
+    be too long. Points reached with the same functions defined that have
+    already failed aren't tried again.
+    """
+    max_calls = (limit + 1) // 2
+    failed: Set[Tuple[int, Tuple[Tuple[str, ...], ...]]] = set()
+
+    def search(start: int, functions: Tuple[Tuple[str, ...], ...], calls: List[int]) -> Optional[Routine]:
+        if start == len(moves):
+            return calls, list(functions)
+        if len(calls) == max_calls or (start, functions) in failed:
+            return None
+
+        for index, function in enumerate(functions):
+            if tuple(moves[start:start + len(function)]) == function:
+                found = search(start + len(function), functions, calls + [index])
+                if found is not None:
+                    return found
+
+        if len(functions) < num_functions:
+            end = start + 1
+            while end <= len(moves) and len(",".join(moves[start:end])) <= limit:
+                function = tuple(moves[start:end])
+                found = search(end, functions + (function,), calls + [len(functions)])
+                if found is not None:
+                    return found
+                end += 1
+
+        failed.add((start, functions))
+        return None
+
+    found = search(0, (), [])
+    if found is None:
+        raise RuntimeError("no routine fits in memory")
+    return found
+
+
+def movement_routine(lines: List[str], video_feed: bool = False) -> str:
+    """
+    the ASCII input for the woken robot: main routine, three functions,
+    and whether to show the video feed
+    """
+    calls, functions = compress(scaffold_path(lines))
+    # a function that's never needed is still asked for
+    functions += [("L",)] * (3 - len(functions))
+    rows = [",".join("ABC"[index] for index in calls)]
+    rows.extend(",".join(function) for function in functions)
+    rows.append("y" if video_feed else "n")
+    return "\n".join(rows) + "\n"
+
+
+EXAMPLE = """#######...#####
+#.....#...#...#
+#.....#...#...#
+......#...#...#
+......#...###.#
+......#.....#.#
+^########...#.#
+......#.#...#.#
+......#########
+........#...#..
+....#########..
+....#...#......
+....#...#......
+....#...#......
+....#####......""".split("\n")
+
+assert ",".join(scaffold_path(EXAMPLE)) == "R,8,R,8,R,4,R,4,R,8,L,6,L,2,R,4,R,4,R,8,R,8,R,8,L,6,L,2"
+calls, functions = compress(scaffold_path(EXAMPLE))
+assert [move for index in calls for move in functions[index]] == scaffold_path(EXAMPLE)
+assert all(len(",".join(function)) <= 20 for function in functions)
 
-it = iter(ascii_input)
+# a robot already facing along the scaffold, or facing away from it
+assert scaffold_path([line.replace("^", ">") for line in EXAMPLE])[:2] == ["8", "R,8"]
+assert scaffold_path([line.replace("^", "<") for line in EXAMPLE])[:2] == ["R", "R,8"]
 
-def get_input() -> int:
-    i = next(it)
-    print(i)
-    return i
+raw_input = movement_routine(lines)
 
 program2 = program[:]
 program2[0] = 2
-computer = IntcodeComputer(program2, get_input)
-
-try:
-    while True:
-        output = computer.go()
-        print(output)
-except EndProgram:
-    pass
\ No newline at end of file
+terminal = Terminal(IntcodeComputer(program2))
+terminal.write(raw_input)
+print(terminal.read())
+print(terminal.values[-1])
@@ -53,6 +53,11 @@ Once you have a working computer, the first step is to restore the gravity assis
 """
 
 from typing import List
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from intcode.batch import BatchIntcodeComputer
 
 program = List[int]
 
@@ -107,9 +112,16 @@ Find the input noun and verb that cause the program to produce the output 196907
 """
 target = 19690720
 
-for noun in range(100):
-    for verb in range(100):
-        output = alarm(program, noun, verb)
-        if output == target:
-            print(noun, verb, 100 * noun + verb)
-            break
\ No newline at end of file
+# every noun/verb pair at once, in lockstep
+pairs = [(noun, verb) for noun in range(100) for verb in range(100)]
+batch = BatchIntcodeComputer(program, patches=[{1: noun, 2: verb} for noun, verb in pairs])
+batch.run()
+
+for k, (noun, verb) in enumerate(pairs):
+    if batch.read(k, 0) == target:
+        print(noun, verb, 100 * noun + verb)
+        break
+# reads past the end see 0 without growing memory; only writes grow it
+probe = BatchIntcodeComputer([1, 10 ** 9, 0, 0, 99], patches=[{}, {}])
+probe.run()
+assert probe.read(0, 0) == 1 and probe.memory.shape[1] == 5
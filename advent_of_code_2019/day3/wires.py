@@ -0,0 +1,171 @@
+"""
+Wires as runs of horizontal and vertical segments, for day 3.
+
+    index = WireIndex([path1, path2])
+    index.closest()        # Manhattan distance of the nearest crossing
+    index.fewest_steps()   # fewest combined steps to a crossing
+
+A wire is kept as its segments, each with the number of steps the wire
+had taken when it entered the segment, so memory grows with the number
+of moves in the path and not with its length. The steps to any cell of a
+segment are those plus the distance along it.
+
+Crossings are found once, when the index is built. Perpendicular ones
+come from a sweep over x: a horizontal segment is live from its left end
+to its right end, and each vertical segment looks up the live segments
+whose y is within its span. Segments that run along the same line are
+matched up separately, line by line; their overlap is a run of shared
+cells rather than one point. Any number of wires can go in one index; a
+wire crossing itself doesn't count, and neither does the central port
+where every wire starts.
+"""
+
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from collections import defaultdict
+import bisect
+
+
+class Segment(NamedTuple):
+    wire: int
+    horizontal: bool
+    # y for a horizontal segment, x for a vertical one
+    fixed: int
+    # the span along the other axis, low <= high
+    low: int
+    high: int
+    # where along that axis the wire came in, and its steps there
+    start: int
+    steps: int
+
+    def steps_to(self, x: int, y: int) -> int:
+        return self.steps + abs((x if self.horizontal else y) - self.start)
+
+
+class Crossing(NamedTuple):
+    """
+    cells two wires share: low == high for wires that cross, a run along
+    one line for segments that overlap
+    """
+    a: Segment
+    b: Segment
+    horizontal: bool
+    fixed: int
+    low: int
+    high: int
+
+    def cells(self) -> Iterator[Tuple[int, int, int]]:
+        """
+        the cells that could be nearest the port or cheapest in steps, as
+        (x, y, combined steps). Distance and steps are both convex along
+        the run, so the best cells are at its ends or where a term bends;
+        the port at step 0 isn't a crossing, so its neighbours stand in
+        for it.
+        """
+        a, b = self.a, self.b
+        bends = {self.low, self.high}
+        for c in (0, a.start, b.start):
+            bends.add(min(max(c, self.low), self.high))
+        for c in list(bends):
+            for near in (c - 1, c, c + 1):
+                if self.low <= near <= self.high:
+                    x, y = (near, self.fixed) if self.horizontal else (self.fixed, near)
+                    steps_a, steps_b = a.steps_to(x, y), b.steps_to(x, y)
+                    if steps_a and steps_b:
+                        yield x, y, steps_a + steps_b
+
+
+def segments(path: str, wire: int = 0) -> List[Segment]:
+    """
+    the segments of a path like "R8,U5,L5,D3"
+    """
+    found = []
+    x = y = steps = 0
+    for move in path.strip().split(","):
+        direction, distance = move[0], int(move[1:])
+        if direction == "R":
+            found.append(Segment(wire, True, y, x, x + distance, x, steps))
+            x += distance
+        elif direction == "L":
+            found.append(Segment(wire, True, y, x - distance, x, x, steps))
+            x -= distance
+        elif direction == "U":
+            found.append(Segment(wire, False, x, y, y + distance, y, steps))
+            y += distance
+        elif direction == "D":
+            found.append(Segment(wire, False, x, y - distance, y, y, steps))
+            y -= distance
+        else:
+            raise RuntimeError(f"bad direction: {direction}")
+        steps += distance
+    return found
+
+
+class WireIndex:
+    def __init__(self, paths: Sequence[str]) -> None:
+        self.wires = [segments(path, wire) for wire, path in enumerate(paths)]
+        self.crossings: List[Crossing] = list(self._perpendicular()) + list(self._overlapping())
+
+    def _perpendicular(self) -> Iterator[Crossing]:
+        # at the same x, segments start, then verticals look, then they end
+        START, LOOK, END = range(3)
+        events = []
+        for wire in self.wires:
+            for segment in wire:
+                if segment.horizontal:
+                    events.append((segment.low, START, segment))
+                    events.append((segment.high, END, segment))
+                else:
+                    events.append((segment.fixed, LOOK, segment))
+        events.sort(key=lambda event: event[:2])
+
+        # live horizontal segments as (y, unique id), and the segments by id
+        live: List[Tuple[int, int]] = []
+        by_id = {}
+        for x, kind, segment in events:
+            key = (segment.fixed, id(segment))
+            if kind == START:
+                bisect.insort(live, key)
+                by_id[key[1]] = segment
+            elif kind == END:
+                del live[bisect.bisect_left(live, key)]
+            else:
+                first = bisect.bisect_left(live, (segment.low, -1))
+                last = bisect.bisect_right(live, (segment.high, float("inf")))
+                for y, key_id in live[first:last]:
+                    other = by_id[key_id]
+                    if other.wire != segment.wire:
+                        yield Crossing(other, segment, True, y, x, x)
+
+    def _overlapping(self) -> Iterator[Crossing]:
+        lines = defaultdict(list)
+        for wire in self.wires:
+            for segment in wire:
+                lines[segment.horizontal, segment.fixed].append(segment)
+
+        for (horizontal, fixed), line in lines.items():
+            line.sort(key=lambda segment: segment.low)
+            # segments that reach at least as far as the current one starts
+            live: List[Segment] = []
+            for segment in line:
+                live = [other for other in live if other.high >= segment.low]
+                for other in live:
+                    if other.wire != segment.wire:
+                        yield Crossing(other, segment, horizontal, fixed,
+                                       segment.low, min(segment.high, other.high))
+                live.append(segment)
+
+    def _best(self, key) -> Optional[int]:
+        values = [key(x, y, steps) for crossing in self.crossings for x, y, steps in crossing.cells()]
+        return min(values) if values else None
+
+    def closest(self) -> Optional[int]:
+        """
+        the Manhattan distance from the port to the nearest crossing
+        """
+        return self._best(lambda x, y, steps: abs(x) + abs(y))
+
+    def fewest_steps(self) -> Optional[int]:
+        """
+        the fewest steps the two wires take, between them, to a crossing
+        """
+        return self._best(lambda x, y, steps: steps)
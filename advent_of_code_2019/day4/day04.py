@@ -19,8 +19,9 @@ How many different passwords within the range given in your puzzle input meet th
 Your puzzle input is 387638-919123.
 """
 
-from typing import List
+from typing import List, Optional
 from collections import Counter
+import functools
 
 def digits(n: int, num_digits: int = 6) -> List[int]:
     d = []
@@ -46,10 +47,62 @@ assert is_valid(111111)
 assert not is_valid(223450)
 assert not is_valid(123789)
 
+def count_valid(lo: int, hi: int, exact_pair: bool = False) -> int:
+    """
+    how many numbers in lo..hi are valid (is_valid, or is_valid2 if exact_pair),
+    without looking at each one: digits are chosen left to right, never below
+    the last one, and the count of ways to finish depends only on the position,
+    the last digit, how long its run is so far, whether an earlier run already
+    qualified, whether the number has started and whether we're still on the
+    edge of the range. Both bounds are padded to hi's width, and the zeros
+    before a number starts are padding, not digits, so numbers of every width
+    in the range are counted as written. Runs only matter up to 3 long (a
+    pair, or more than a pair).
+    """
+    lo = max(lo, 0)
+    if lo > hi:
+        return 0
+    num_digits = len(str(hi))
+    low, high = digits(lo, num_digits), digits(hi, num_digits)
+
+    def qualifies(run: int) -> bool:
+        return run == 2 if exact_pair else run >= 2
+
+    @functools.lru_cache(maxsize=None)
+    def count(i: int, last: int, run: int, paired: bool, started: bool, at_low: bool, at_high: bool) -> int:
+        if i == num_digits:
+            return int(paired or qualifies(run))
+        total = 0
+        for d in range(max(last, low[i] if at_low else 0), (high[i] if at_high else 9) + 1):
+            if not started and d == 0:
+                next_run, next_paired = 0, False
+            elif d == last:
+                next_run, next_paired = min(run + 1, 3), paired
+            else:
+                next_run, next_paired = 1, paired or qualifies(run)
+            total += count(i + 1, d, next_run, next_paired, started or d > 0,
+                           at_low and d == low[i], at_high and d == high[i])
+        return total
+
+    return count(0, 0, 0, False, False, True, True)
+
+def is_valid_as_written(n: int, exact_pair: bool = False) -> bool:
+    """
+    is_valid (or is_valid2) on n's own digits rather than six of them
+    """
+    d = digits(n, len(str(n)))
+    return is_increasing(d) and (has_group_of_two(d) if exact_pair else adjacent_same(d))
+
+assert count_valid(111000, 125000) == sum(is_valid(d) for d in range(111000, 125001))
+assert count_valid(1, 999) == 90
+assert count_valid(1, 12345) == sum(is_valid_as_written(d) for d in range(1, 12346))
+assert count_valid(100, 99) == 0
+assert count_valid(0, 10 ** 20 - 1) > 0
+
 LO = 387638
 HI = 919123
 
-print(sum(is_valid(d) for d in range(LO, HI + 1)))
+print(count_valid(LO, HI))
 
 """
 An Elf just remembered one more important detail: the two adjacent matching digits are not part of a larger group of matching digits.
@@ -76,5 +129,7 @@ def is_valid2(n: int) -> bool:
 assert is_valid2(112233)
 assert not is_valid2(123444)
 assert is_valid2(111122)
+assert count_valid(111000, 125000, exact_pair=True) == sum(is_valid2(d) for d in range(111000, 125001))
+assert count_valid(1, 12345, exact_pair=True) == sum(is_valid_as_written(d, True) for d in range(1, 12346))
 
-print(sum(is_valid2(d) for d in range(LO, HI + 1)))
\ No newline at end of file
+print(count_valid(LO, HI, exact_pair=True))
\ No newline at end of file
@@ -49,10 +49,69 @@ assert count_ancestors('D', PARENTS) == 3
 assert count_ancestors('L', PARENTS) == 7
 assert count_ancestors('COM', PARENTS) == 0
 
-def total_ancestors(orbits: List[Orbit]) -> int:
-    parents = make_tree(orbits)
+class OrbitIndex:
+    """
+    Depths and ancestor jumps for every object, built once from make_tree's
+    parent map so that the total orbit count is a sum and the distance
+    between two objects takes O(log n). Objects are numbered in
+    breadth-first order from the roots (COM), so every object comes after
+    its parent and nothing needs recursion however deep the chains go.
+    up[k][i] is the object 2 ** k orbits above object i (a root is its own
+    ancestor).
+    """
+    def __init__(self, parents: Dict[str, str]) -> None:
+        children = defaultdict(list)
+        for child, parent in parents.items():
+            children[parent].append(child)
+
+        self.names = [name for name in children if name not in parents]
+        self.depths = [0] * len(self.names)
+        up = list(range(len(self.names)))
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+        i = 0
+        while i < len(self.names):
+            for child in children[self.names[i]]:
+                self.ids[child] = len(self.names)
+                self.names.append(child)
+                self.depths.append(self.depths[i] + 1)
+                up.append(i)
+            i += 1
+
+        self.up = [up]
+        for _ in range(max(self.depths, default=0).bit_length() - 1):
+            up = [up[above] for above in up]
+            self.up.append(up)
+
+    def total_orbits(self) -> int:
+        return sum(self.depths)
+
+    def common_ancestor(self, a: str, b: str) -> str:
+        i, j = self.ids[a], self.ids[b]
+        if self.depths[i] < self.depths[j]:
+            i, j = j, i
+        gap = self.depths[i] - self.depths[j]
+        for k, up in enumerate(self.up):
+            if gap >> k & 1:
+                i = up[i]
+        if i == j:
+            return self.names[i]
+        for up in reversed(self.up):
+            if up[i] != up[j]:
+                i, j = up[i], up[j]
+        return self.names[self.up[0][i]]
+
+    def transfers(self, a: str, b: str) -> int:
+        ancestor = self.common_ancestor(a, b)
+        return self.depths[self.ids[a]] + self.depths[self.ids[b]] - 2 * self.depths[self.ids[ancestor]]
+
+INDEX = OrbitIndex(PARENTS)
+
+assert INDEX.common_ancestor('L', 'F') == 'E'
+assert INDEX.common_ancestor('H', 'COM') == 'COM'
 
-    return sum(count_ancestors(child, parents) for child in parents)
+def total_ancestors(orbits: List[Orbit]) -> int:
+    return OrbitIndex(make_tree(orbits)).total_orbits()
 
 assert total_ancestors(ORBITS) == 42
 
@@ -137,6 +196,8 @@ def shortest_path(child1: str, child2: str, parents: Dict[str, str]) -> int:
 
 assert shortest_path('I', 'K', PARENTS) == 4
 assert shortest_path('H', 'F', PARENTS) == 6
+assert INDEX.transfers('I', 'K') == 4
+assert INDEX.transfers('H', 'F') == 6
 
 parents = make_tree(orbits)
-print(shortest_path(parents['YOU'], parents['SAN'], parents))
\ No newline at end of file
+print(OrbitIndex(parents).transfers(parents['YOU'], parents['SAN']))
\ No newline at end of file
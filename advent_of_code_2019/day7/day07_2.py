@@ -36,145 +36,31 @@ Here are some example programs:
 Try every combination of the new phase settings on the amplifier feedback loop. What is the highest signal that can be sent to the thrusters?
 """
 
-from typing import List, NamedTuple, Tuple
-from enum import Enum
+from typing import List
 import itertools
-from collections import deque
-
-class Opcode(Enum):
-    ADD = 1
-    MULTIPLY = 2
-    STORE_INPUT = 3
-    SEND_TO_OUTPUT = 4
-    JUMP_IF_TRUE = 5
-    JUMP_IF_FALSE = 6
-    LESS_THAN = 7
-    EQUALS = 8
-    END_PROGRAM = 99
-
-Modes = List[int]
-
-def parse_opcode(opcode: int, num_modes: int = 3) -> Tuple[Opcode, Modes]:
-    opcode_part = opcode % 100
-    
-    modes: List[int] = []
-    opcode = opcode // 100
-
-    for _ in range(num_modes):
-        modes.append(opcode % 10)
-        opcode = opcode // 10
-    
-    return Opcode(opcode_part), modes
-
-Program = List[int]
-
-class Amplifier:
-    def __init__(self, program: List[int], phase: int) -> None:
-        self.program = program[:]
-        self.inputs = deque([phase])
-        self.pos = 0
-    
-    def get_value(self, pos: int, mode: int) -> int:
-        if mode == 0:
-            return self.program[self.program[pos]]
-        elif mode == 1:
-            return self.program[pos]
-        else:
-            raise ValueError(f"unknown mode: {mode}")
-
-    def step(self: int, input_value: int) -> int:
-        self.inputs.append(input_value)
-
-        while True:
-            opcode, modes = parse_opcode(self.program[self.pos])
-
-            if opcode == Opcode.END_PROGRAM:
-                return None
-            elif opcode == Opcode.ADD:
-                value1 = self.get_value(self.pos + 1, modes[0])
-                value2 = self.get_value(self.pos + 2, modes[1])
-                self.program[self.program[self.pos + 3]] = value1 + value2
-                self.pos += 4
-
-            elif opcode == Opcode.MULTIPLY:
-                value1 = self.get_value(self.pos + 1, modes[0])
-                value2 = self.get_value(self.pos + 2, modes[1])
-                self.program[self.program[self.pos + 3]] = value1 * value2
-                self.pos += 4
-
-            elif opcode == Opcode.STORE_INPUT:
-                # Get input and store at location
-                loc = self.program[self.pos + 1]
-                input_value = self.inputs.popleft()
-                self.program[loc] = input_value
-                self.pos += 2
-
-            elif opcode == Opcode.SEND_TO_OUTPUT:
-                # Get output from location
-                value = self.get_value(self.pos + 1, modes[0])
-                self.pos += 2
-                return value
-
-            elif opcode == Opcode.JUMP_IF_TRUE:
-                # jump if true
-                value1 = self.get_value(self.pos + 1, modes[0])
-                value2 = self.get_value(self.pos + 2, modes[1])
-
-                if value1 != 0:
-                    self.pos = value2
-                else:
-                    self.pos += 3
-
-            elif opcode == Opcode.JUMP_IF_FALSE:
-                value1 = self.get_value(self.pos + 1, modes[0])
-                value2 = self.get_value(self.pos + 2, modes[1])
-
-                if value1 == 0:
-                    self.pos = value2
-                else:
-                    self.pos += 3
-
-            elif opcode == Opcode.LESS_THAN:
-                value1 = self.get_value(self.pos + 1, modes[0])
-                value2 = self.get_value(self.pos + 2, modes[1])
-
-                if value1 < value2:
-                    self.program[self.program[self.pos + 3]] = 1
-                else:
-                    self.program[self.program[self.pos + 3]] = 0
-                self.pos += 4
-
-            elif opcode == Opcode.EQUALS:
-                value1 = self.get_value(self.pos + 1, modes[0])
-                value2 = self.get_value(self.pos + 2, modes[1])
-
-                if value1 == value2:
-                    self.program[self.program[self.pos + 3]] = 1
-                else:
-                    self.program[self.program[self.pos + 3]] = 0
-                self.pos += 4
-
-            else:
-                raise RuntimeError(f"invalid opcode: {opcode}")
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from intcode.network import Network
 
 def run_amplifiers(program: List[int], phases: List[int]) -> int:
-    amplifiers = [Amplifier(program, phase) for phase in phases]
-    n = len(amplifiers)
-    num_finished = 0
-
-    last_output = 0
-    last_non_none_output = None
-    aid = 0
-
-    while num_finished < n:
-        last_output = amplifiers[aid].step(last_output)
-        if last_output is None:
-            num_finished += 1
-        else:
-            last_non_none_output = last_output
-        aid = (aid + 1) % n
-    
-    return last_non_none_output
+    # a ring of amplifiers, each feeding the next; an amplifier only runs
+    # once there is a signal waiting for it
+    network = Network()
+    names = [f"amp{i}" for i in range(len(phases))]
+
+    for name, phase in zip(names, phases):
+        network.add(name, program)
+        network.send(name, phase)
+
+    for source, target in zip(names, names[1:] + names[:1]):
+        network.connect(source, target)
+
+    network.send(names[0], 0)
+    network.run(expect_halt=True)
+
+    return network.nodes[names[-1]].last_output
 
 PROG1 = [3,26,1001,26,-4,26,3,27,1002,27,2,27,1,27,26,
 27,4,27,1001,28,-1,28,1005,28,6,99,0,0,5]
@@ -22,58 +22,75 @@ The image you received is 25 pixels wide and 6 pixels tall.
 To make sure the image wasn't corrupted during transmission, the Elves would like you to find the layer that contains the fewest 0 digits. On that layer, what is the number of 1 digits multiplied by the number of 2 digits?
 """
 
-from typing import List, Dict
-from collections import Counter
+from typing import IO, Optional, Tuple
 
-Image = List[List[List[int]]]
+import numpy as np
 
-def parse_image(raw: str, width: int, height: int) -> Image:
-    pixels = [int(c) for c in raw]
-
-    num_layers = len(pixels) //  width // height
-
-    image = [
-        [
-        [None for _ in range(width)]
-        for _ in range(height)
-        ]
-        for _ in range(num_layers)
-    ]
-
-    layer = i = j = 0
-
-    for pixel in pixels:
-        image[layer][i][j] = pixel
+# layers x height x width digits
+Image = np.ndarray
 
-        j += 1
+WHITE, TRANSPARENT = 1, 2
 
-        if j == width :
-            j = 0
-            i += 1
-        
-        if i == height:
-            i = 0
-            layer += 1
-    
-    return image
+def parse_image(raw: str, width: int, height: int) -> Image:
+    pixels = np.frombuffer(raw.encode("ascii"), dtype=np.uint8) - ord("0")
+    return pixels.reshape(-1, height, width)
 
 RAW = '123456789012'
 IMAGE = parse_image(RAW, 3, 2)
-assert IMAGE == [[[1, 2, 3], [4, 5, 6]], [[7, 8, 9], [0, 1, 2]]]
+assert IMAGE.tolist() == [[[1, 2, 3], [4, 5, 6]], [[7, 8, 9], [0, 1, 2]]]
 
-def count_colors(image: Image) -> List[Dict[int, int]]:
-    return [
-        Counter(pixel for row in layer for pixel in row)
-        for layer in image
-    ]
+def checksum(image: Image) -> Tuple[int, int]:
+    """
+    (zeros, ones times twos) for the layer with the fewest zeros
+    """
+    zeros = (image == 0).sum(axis=(1, 2))
+    layer = image[zeros.argmin()]
+    return int(zeros.min()), int((layer == 1).sum()) * int((layer == 2).sum())
 
 def one_times_two(image: Image) -> int:
-    color_counts = count_colors(image)
-    layer_counts = min(color_counts, key = lambda cc: cc[0])
-    return layer_counts[1] * layer_counts[2]
+    return checksum(image)[1]
 
 assert one_times_two(IMAGE) == 1
 
+def composite(image: Image) -> np.ndarray:
+    """
+    the first pixel that isn't transparent at each position, front to back
+    (transparent if there isn't one)
+    """
+    first = (image != TRANSPARENT).argmax(axis=0)
+    return np.take_along_axis(image, first[np.newaxis], axis=0)[0]
+
+def read_image(f: IO[str], width: int, height: int, chunk_layers: int = 4096) -> Tuple[int, np.ndarray]:
+    """
+    one_times_two and the composite image, reading chunk_layers layers at
+    a time so that the whole image never has to be in memory
+    """
+    layer_size = width * height
+    best: Optional[Tuple[int, int]] = None
+    picture = np.full((height, width), TRANSPARENT, dtype=np.uint8)
+    leftover = ""
+
+    while True:
+        chunk = f.read(layer_size * chunk_layers)
+        digits = leftover + chunk.strip()
+        usable = len(digits) - len(digits) % layer_size
+        if usable:
+            layers = parse_image(digits[:usable], width, height)
+            found = checksum(layers)
+            if best is None or found[0] < best[0]:
+                best = found
+            behind = picture == TRANSPARENT
+            picture[behind] = composite(layers)[behind]
+        leftover = digits[usable:]
+        if not chunk:
+            break
+
+    if leftover:
+        raise ValueError(f"{len(leftover)} digits left over after the last whole layer")
+    if best is None:
+        raise ValueError("no layers")
+    return best[1], picture
+
 with open('day_8_input.txt') as f:
     raw = f.read().strip()
 
@@ -114,31 +131,20 @@ So, the final image looks like this:
 
 What message is produced after decoding your image?
 """
-import copy
-
-def show(image: Image) -> None:
-    consolidated = copy.deepcopy(image[0])
-    num_layers = len(image)
-    height = len(image[0])
-    width = len(image[0][0])
-
-    for i in range(height):
-        for j in range(width):
-            for layer in range(num_layers):
-                color = image[layer][i][j]
-                if color == 0:
-                    consolidated[i][j] = ' '
-                    break
-                elif color == 1:
-                    consolidated[i][j] = '*'
-                    break
-    
-    for row in consolidated:
-        print("".join(row))
-    
+def show(picture: np.ndarray) -> None:
+    for row in picture:
+        print("".join("*" if color == WHITE else " " for color in row))
+
 RAW2 = "0222112222120000"
 IMAGE2 = parse_image(RAW2, 2, 2)
+assert composite(IMAGE2).tolist() == [[0, 1], [1, 0]]
 
-#show(IMAGE2)
+#show(composite(IMAGE2))
+
+# a few layers at a time gives the same answers as the whole image at once
+with open('day_8_input.txt') as f:
+    streamed = read_image(f, 25, 6, chunk_layers=7)
+assert streamed[0] == one_times_two(image)
+assert np.array_equal(streamed[1], composite(image))
 
-show(image)
+show(streamed[1])
\ No newline at end of file
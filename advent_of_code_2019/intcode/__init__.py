@@ -0,0 +1,22 @@
+"""
+The shared Intcode computer for the 2019 puzzles.
+
+Each day used to carry its own copy of IntcodeComputer; they all import it
+from here now. Day scripts live one directory down, so they put this
+directory on sys.path before importing:
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    from intcode import IntcodeComputer, EndProgram
+"""
+
+from intcode.computer import (
+    EndProgram,
+    IntcodeComputer,
+    Modes,
+    Opcode,
+    Program,
+    parse_opcode,
+    run,
+)
+from intcode.compiler import CompiledIntcodeComputer
+from intcode.memo import MemoisingIntcodeComputer
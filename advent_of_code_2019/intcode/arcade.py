@@ -0,0 +1,140 @@
+"""
+A headless runner for the day 13 arcade cabinet.
+
+    arcade = Arcade(program)
+    score = arcade.play()
+
+The cabinet draws with (x, y, tile) output triples and sets the score with
+(-1, 0, score); it asks for the joystick once per frame. Arcade lets the
+computer run until it wants the joystick, takes the whole frame's outputs
+from run_until_blocked() and decodes them in one pass, keeping only what
+the joystick needs: where the ball and paddle are, how many blocks are
+left and the score. The joystick then follows the ball.
+
+Nothing is drawn unless a Renderer is given; it redraws just the cells
+each frame changed.
+
+    python -m intcode.arcade day13/day_13_input.txt [--render]
+"""
+
+from typing import Dict, List, Optional, Set, TextIO, Tuple
+import sys
+import time
+
+from intcode.computer import IntcodeComputer, Program
+
+
+EMPTY, WALL, BLOCK, PADDLE, BALL = range(5)
+
+GLYPHS = {EMPTY: " ", WALL: "X", BLOCK: "#", PADDLE: "-", BALL: "o"}
+
+
+class Renderer:
+    """
+    Draws frames on an ANSI terminal. Each cell is drawn when its tile
+    changes, by moving the cursor to it, so a frame costs O(cells changed).
+    """
+    def __init__(self, stream: TextIO = sys.stdout) -> None:
+        self.stream = stream
+        self._drawn: Dict[Tuple[int, int], int] = {}
+        self._bottom = 0
+
+    def draw(self, cells: List[Tuple[int, int, int]], score: int) -> None:
+        drawn = self._drawn
+        parts = []
+        for x, y, tile in cells:
+            if drawn.get((x, y), EMPTY) != tile:
+                drawn[(x, y)] = tile
+                self._bottom = max(self._bottom, y + 1)
+                parts.append(f"\x1b[{y + 1};{x + 1}H{GLYPHS[tile]}")
+        parts.append(f"\x1b[{self._bottom + 1};1Hscore {score}\x1b[K")
+        self.stream.write("".join(parts))
+        self.stream.flush()
+
+    def clear(self) -> None:
+        self.stream.write("\x1b[2J")
+
+
+class Arcade:
+    def __init__(self,
+                 program: Program,
+                 free_play: bool = True,
+                 renderer: Optional[Renderer] = None,
+                 computer_class=IntcodeComputer) -> None:
+        program = list(program)
+        if free_play:
+            # two quarters
+            program[0] = 2
+        self.computer = computer_class(program)
+        self.renderer = renderer
+        self.ball: Optional[int] = None
+        self.paddle: Optional[int] = None
+        self.blocks = 0
+        self.score = 0
+        self.frames = 0
+        # positions of the blocks still standing
+        self._blocks: Set[Tuple[int, int]] = set()
+
+    def _decode(self, outputs) -> List[Tuple[int, int, int]]:
+        """
+        fold a frame's output triples into the state; returns the cells drawn
+        """
+        blocks = self._blocks
+        it = iter(outputs)
+        cells = []
+        for x, y, tile in zip(it, it, it):
+            if x == -1 and y == 0:
+                self.score = tile
+                continue
+            if tile == BLOCK:
+                blocks.add((x, y))
+            else:
+                blocks.discard((x, y))
+                if tile == BALL:
+                    self.ball = x
+                elif tile == PADDLE:
+                    self.paddle = x
+            cells.append((x, y, tile))
+        self.blocks = len(blocks)
+        return cells
+
+    def joystick(self) -> int:
+        if self.ball is None or self.paddle is None:
+            return 0
+        return (self.ball > self.paddle) - (self.ball < self.paddle)
+
+    def play(self) -> int:
+        """
+        run until the game is over; returns the final score
+        """
+        computer = self.computer
+        renderer = self.renderer
+        if renderer is not None:
+            renderer.clear()
+
+        while True:
+            cells = self._decode(computer.run_until_blocked())
+            if renderer is not None:
+                renderer.draw(cells, self.score)
+            if computer.halted:
+                return self.score
+            computer.send((self.joystick(),))
+            self.frames += 1
+
+
+def main(path: str, render: bool = False) -> None:
+    with open(path) as f:
+        program = [int(n) for n in f.read().strip().split(",")]
+
+    arcade = Arcade(program, renderer=Renderer() if render else None)
+    start = time.perf_counter()
+    score = arcade.play()
+    elapsed = time.perf_counter() - start
+    if render:
+        print()
+    print(f"score {score}, {arcade.blocks} blocks left")
+    print(f"{arcade.frames} frames in {elapsed:.3f}s, {arcade.frames / elapsed:,.0f} frames/sec")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], "--render" in sys.argv[2:])
@@ -0,0 +1,71 @@
+"""
+Line-oriented ASCII I/O for Intcode programs that talk in text (days 17
+and 21).
+
+    terminal = Terminal(IntcodeComputer(program))
+    terminal.writeline("NOT A J")
+    terminal.writeline("WALK")
+    for line in terminal.readlines():
+        print(line)
+    print(terminal.values)
+
+Input goes into the computer's inputs deque as a whole string at a time;
+output comes back from run_until_blocked() in one batch and is decoded in
+one go. Outputs that aren't ASCII (the puzzle answers) are kept apart in
+terminal.values rather than mixed into the text.
+"""
+
+from typing import Iterable, List
+
+from intcode.computer import IntcodeComputer
+
+
+class Terminal:
+    def __init__(self, computer: IntcodeComputer) -> None:
+        self.computer = computer
+        self.values: List[int] = []
+        # text after the last newline, waiting for the rest of its line
+        self._partial = ""
+
+    @property
+    def halted(self) -> bool:
+        return self.computer.halted
+
+    def write(self, text: str) -> None:
+        self.computer.send(text)
+
+    def writeline(self, line: str) -> None:
+        self.computer.send(line + "\n")
+
+    def writelines(self, lines: Iterable[str]) -> None:
+        self.computer.send("".join(line + "\n" for line in lines))
+
+    def read(self) -> str:
+        """
+        run until the computer blocks or halts; returns the text it printed
+        """
+        outputs = self.computer.run_until_blocked()
+        if not outputs or max(outputs) < 128 and min(outputs) >= 0:
+            # bytes(outputs) would copy the raw 64-bit buffer
+            return bytes(outputs.tolist()).decode("ascii")
+
+        text = []
+        for value in outputs:
+            if 0 <= value < 128:
+                text.append(chr(value))
+            else:
+                self.values.append(value)
+        return "".join(text)
+
+    def readlines(self) -> List[str]:
+        """
+        run until the computer blocks or halts; returns the complete lines
+        it printed. An unfinished line is held back until the rest of it
+        arrives, or returned once the computer halts.
+        """
+        lines = (self._partial + self.read()).split("\n")
+        self._partial = lines.pop()
+        if self.halted and self._partial:
+            lines.append(self._partial)
+            self._partial = ""
+        return lines
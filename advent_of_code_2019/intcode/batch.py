@@ -0,0 +1,240 @@
+"""
+Run many copies of one Intcode program in lockstep.
+
+Memory is a K x N int64 array, one row per instance. Every round each
+running instance executes exactly one instruction: instances are grouped
+by (instruction pointer, instruction word), and each group's instruction
+is applied as one vectorised operation over its rows. Instances whose
+branches diverge simply land in different groups on the next round.
+
+An instance whose ADD or MULTIPLY would overflow int64 (or whose program,
+patches or inputs don't fit in int64 to begin with) is taken out of the
+batch before that instruction and finished on an ordinary IntcodeComputer
+with Python ints, so results are exactly what the scalar computer gives.
+
+Needs numpy, unlike the rest of the package.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from intcode.computer import IntcodeComputer, EndProgram, Program, LENGTHS
+
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+
+def fits_int64(values: Sequence[int]) -> bool:
+    return all(INT64_MIN <= value <= INT64_MAX for value in values)
+
+
+class BatchIntcodeComputer:
+    """
+    inputs[k] is the complete input for instance k; patches[k] maps
+    addresses to the values instance k should start with instead of the
+    program's (day 2's noun and verb). run() returns each instance's outputs.
+    """
+    def __init__(self,
+                 program: Program,
+                 inputs: Optional[Sequence[Sequence[int]]] = None,
+                 patches: Optional[Sequence[Dict[int, int]]] = None) -> None:
+        if inputs is None and patches is None:
+            raise ValueError("need inputs or patches to know how many instances to run")
+        count = len(inputs) if inputs is not None else len(patches)
+        inputs = inputs if inputs is not None else [()] * count
+        patches = patches if patches is not None else [{}] * count
+        if len(inputs) != count or len(patches) != count:
+            raise ValueError("inputs and patches must have one entry per instance")
+
+        self.count = count
+        self.outputs: List[List[int]] = [[] for _ in range(count)]
+        # instances finished on a scalar computer, by index
+        self.evicted: Dict[int, IntcodeComputer] = {}
+
+        size = max([len(program)] + [loc + 1 for patch in patches for loc in patch])
+        self.memory = np.zeros((count, size), dtype=np.int64)
+        self.pos = np.zeros(count, dtype=np.int64)
+        self.relative_base = np.zeros(count, dtype=np.int64)
+        self.running = np.ones(count, dtype=bool)
+
+        width = max([len(values) for values in inputs] + [1])
+        self._input_table = np.zeros((count, width), dtype=np.int64)
+        self._input_count = np.array([len(values) for values in inputs], dtype=np.int64)
+        self._input_cursor = np.zeros(count, dtype=np.int64)
+        self._inputs = inputs
+
+        wide_program = not fits_int64(program)
+        if not wide_program:
+            self.memory[:, :len(program)] = program
+
+        for k in range(count):
+            if wide_program or not fits_int64(patches[k].values()) or not fits_int64(inputs[k]):
+                image = list(program)
+                image.extend([0] * (size - len(image)))
+                for loc, value in patches[k].items():
+                    image[loc] = value
+                self._evict(k, image)
+                continue
+            for loc, value in patches[k].items():
+                self.memory[k, loc] = value
+            self._input_table[k, :len(inputs[k])] = inputs[k]
+
+    def read(self, instance: int, loc: int) -> int:
+        if instance in self.evicted:
+            return self.evicted[instance]._read(loc)
+        return int(self.memory[instance, loc]) if loc < self.memory.shape[1] else 0
+
+    def run(self) -> List[List[int]]:
+        while True:
+            active = np.flatnonzero(self.running)
+            if not active.size:
+                return self.outputs
+
+            pcs = self.pos[active]
+            if pcs.min() < 0:
+                # NumPy would wrap a negative index round to the end of memory
+                raise ValueError(f"negative address: {int(pcs.min())}")
+            words = self._gather(active, pcs)
+
+            order = np.lexsort((words, pcs))
+            pcs = pcs[order]
+            words = words[order]
+            boundaries = np.flatnonzero((pcs[1:] != pcs[:-1]) | (words[1:] != words[:-1])) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [len(order)]))
+
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                self._execute(active[order[start:end]], int(pcs[start]), int(words[start]))
+
+    def _ensure(self, loc: int) -> None:
+        """
+        make sure column loc exists, before writing to it
+        """
+        size = self.memory.shape[1]
+        if loc >= size:
+            size = max(loc + 1, 2 * size)
+            extra = np.zeros((self.count, size - self.memory.shape[1]), dtype=np.int64)
+            self.memory = np.concatenate((self.memory, extra), axis=1)
+
+    def _gather(self, rows: np.ndarray, loc) -> np.ndarray:
+        """
+        memory[rows, loc] for a column or one per row; past the end reads as
+        0 without growing memory
+        """
+        size = self.memory.shape[1]
+        if np.max(loc) < size:
+            return self.memory[rows, loc]
+        loc = np.broadcast_to(loc, rows.shape)
+        inside = loc < size
+        values = np.zeros(len(rows), dtype=np.int64)
+        values[inside] = self.memory[rows[inside], loc[inside]]
+        return values
+
+    def _address(self, rows: np.ndarray, pos: int, mode: int) -> np.ndarray:
+        loc = self._gather(rows, pos)
+        if mode == 2:
+            loc = loc + self.relative_base[rows]
+        if loc.min() < 0:
+            raise ValueError(f"negative address: {int(loc.min())}")
+        return loc
+
+    def _value(self, rows: np.ndarray, pos: int, mode: int) -> np.ndarray:
+        if mode == 1:
+            return self._gather(rows, pos)
+        return self._gather(rows, self._address(rows, pos, mode))
+
+    def _execute(self, rows: np.ndarray, pos: int, word: int) -> None:
+        opcode = word % 100
+        if opcode == 99:
+            self.running[rows] = False
+            return
+        if opcode not in LENGTHS:
+            raise ValueError(f"invalid opcode: {opcode}")
+        modes = [word // 100 % 10, word // 1000 % 10, word // 10000 % 10]
+        for mode in modes[:LENGTHS[opcode] - 1]:
+            if mode not in (0, 1, 2):
+                raise ValueError(f"unknown mode: {mode}")
+
+        if opcode in (1, 2, 7, 8):
+            value1 = self._value(rows, pos + 1, modes[0])
+            value2 = self._value(rows, pos + 2, modes[1])
+
+            if opcode == 1:
+                result = value1 + value2
+                overflow = ((value1 ^ result) & (value2 ^ result)) < 0
+            elif opcode == 2:
+                result = value1 * value2
+                estimate = np.abs(value1.astype(np.float64) * value2.astype(np.float64))
+                overflow = np.zeros(len(rows), dtype=bool)
+                for i in np.flatnonzero(estimate >= 2.0 ** 62).tolist():
+                    product = int(value1[i]) * int(value2[i])
+                    overflow[i] = not INT64_MIN <= product <= INT64_MAX
+            elif opcode == 7:
+                result = (value1 < value2).astype(np.int64)
+                overflow = None
+            else:
+                result = (value1 == value2).astype(np.int64)
+                overflow = None
+
+            if overflow is not None and overflow.any():
+                for k in rows[overflow].tolist():
+                    self._evict(k)
+                keep = ~overflow
+                rows, result = rows[keep], result[keep]
+                if not rows.size:
+                    return
+
+            loc = self._address(rows, pos + 3, modes[2])
+            self._ensure(int(loc.max()))
+            self.memory[rows, loc] = result
+            self.pos[rows] += 4
+
+        elif opcode == 3:
+            cursor = self._input_cursor[rows]
+            starved = cursor >= self._input_count[rows]
+            if starved.any():
+                raise ValueError(f"instance {int(rows[starved][0])} ran out of input")
+            loc = self._address(rows, pos + 1, modes[0])
+            self._ensure(int(loc.max()))
+            self.memory[rows, loc] = self._input_table[rows, cursor]
+            self._input_cursor[rows] += 1
+            self.pos[rows] += 2
+
+        elif opcode == 4:
+            for k, value in zip(rows.tolist(), self._value(rows, pos + 1, modes[0]).tolist()):
+                self.outputs[k].append(value)
+            self.pos[rows] += 2
+
+        elif opcode == 5 or opcode == 6:
+            value1 = self._value(rows, pos + 1, modes[0])
+            jump = value1 != 0 if opcode == 5 else value1 == 0
+            self.pos[rows] = pos + 3
+            if jump.any():
+                taken = rows[jump]
+                self.pos[taken] = self._value(taken, pos + 2, modes[1])
+
+        else:
+            # opcode 9
+            self.relative_base[rows] += self._value(rows, pos + 1, modes[0])
+            self.pos[rows] += 2
+
+    def _evict(self, k: int, image: Optional[List[int]] = None) -> None:
+        """
+        finish instance k on a scalar computer, from its current state
+        """
+        computer = IntcodeComputer(image if image is not None else self.memory[k].tolist())
+        computer.pos = int(self.pos[k])
+        computer.relative_base = int(self.relative_base[k])
+        computer.inputs.extend(self._inputs[k][int(self._input_cursor[k]):])
+        self.running[k] = False
+        self.evicted[k] = computer
+
+        try:
+            while True:
+                self.outputs[k].append(computer.go())
+        except EndProgram:
+            pass
+        except IndexError:
+            raise ValueError(f"instance {k} ran out of input")
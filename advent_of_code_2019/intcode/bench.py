@@ -0,0 +1,230 @@
+"""
+Intcode throughput over the benchmark corpus (intcode.corpus): every
+workload under every backend, with the decode cache off (every instruction
+decoded each time it runs), on, with list memory instead of array('q'),
+with the basic-block compiler, and with memoised call frames (where the
+rate counts the instructions a reused frame skipped).
+
+Each workload/backend pair is measured in a fresh process, so one pair's
+memory doesn't show up in the next one's peak. It reports
+
+    instructions/sec    from the fastest of --repeat timed runs
+    wall time           of that run
+    peak RSS            of the measuring process, which starts as a fork
+                        of this one, so compare it between rows and runs
+                        rather than reading it as the workload's own size
+    traced peak         the most memory Python had allocated at once
+                        during one more run under tracemalloc
+    retained blocks     memory blocks still allocated after that run (and
+                        a garbage collection) that weren't before it
+
+and checks every answer against the corpus. CPython only counts
+allocations in debug builds, so allocations per instruction aren't
+measured; the traced peak and retained blocks are the memory figures a
+release build can give. --json writes the results
+(to a file, or - for stdout) for diffing between commits, and --compare
+lines up two such files. Run from the advent_of_code_2019 directory:
+
+    python -m intcode.bench [--repeat N] [--json PATH]
+    python -m intcode.bench --compare OLD.json NEW.json
+
+or, for an execution profile of BOOST (day 9, input 2) instead:
+
+    python -m intcode.bench --profile
+"""
+
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+import argparse
+import functools
+import gc
+import json
+import multiprocessing
+import platform
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # not on Windows; peak RSS is reported as null there
+    resource = None
+
+from intcode.computer import IntcodeComputer, EndProgram
+from intcode.compiler import CompiledIntcodeComputer
+from intcode.corpus import WORKLOADS, NewComputer, load_program
+from intcode.memo import MemoisingIntcodeComputer
+from intcode.profiler import Profile
+
+
+BACKENDS: Dict[str, NewComputer] = {
+    "uncached": functools.partial(IntcodeComputer, decode_cache=False),
+    "decode cache": IntcodeComputer,
+    "list memory": functools.partial(IntcodeComputer, int64=False),
+    "compiled": CompiledIntcodeComputer,
+    "memoised": MemoisingIntcodeComputer,
+}
+
+
+def _peak_rss_kb() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _traced(run: Callable[[], Any]) -> Tuple[int, int]:
+    """
+    (peak bytes traced, blocks left allocated) for one call of run
+    """
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    run()
+    traced_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    gc.collect()
+    return traced_peak, sys.getallocatedblocks() - blocks
+
+
+def measure(workload_name: str, backend: str, repeat: int) -> Dict[str, Any]:
+    """
+    one workload under one backend; runs in its own process
+    """
+    workload = next(workload for workload in WORKLOADS if workload.name == workload_name)
+    new = BACKENDS[backend]
+    program = workload.program()
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result, steps = workload.run(new, program)
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best[2]:
+            best = (result, steps, seconds)
+    result, steps, seconds = best
+    peak_rss = _peak_rss_kb()
+
+    traced_peak, retained = _traced(lambda: workload.run(new, program))
+    # what measuring itself leaves behind
+    retained -= _traced(lambda: None)[1]
+
+    return {
+        "workload": workload.name,
+        "backend": backend,
+        "ok": result == workload.expected,
+        "instructions": steps,
+        "seconds": round(seconds, 6),
+        "instructions_per_sec": round(steps / seconds),
+        "peak_rss_kb": peak_rss,
+        "traced_peak_bytes": traced_peak,
+        "retained_blocks": retained,
+    }
+
+
+def measure_corpus(repeat: int = 3) -> Iterator[Dict[str, Any]]:
+    """
+    every workload under every backend, a row as each is measured
+    """
+    try:
+        context = multiprocessing.get_context("fork")
+    except ValueError:
+        context = multiprocessing.get_context()
+    for workload in WORKLOADS:
+        for backend in BACKENDS:
+            with context.Pool(1) as pool:
+                yield pool.apply(measure, (workload.name, backend, repeat))
+
+
+HEADER = (f"{'workload':<22} {'backend':<13} {'instructions':>12} {'seconds':>8} "
+          f"{'instr/sec':>11} {'peak RSS':>10} {'traced peak':>12} {'retained':>9}")
+
+
+def format_row(row: Dict[str, Any]) -> str:
+    rss = "-" if row["peak_rss_kb"] is None else f"{row['peak_rss_kb']:,}K"
+    return (f"{row['workload']:<22} {row['backend']:<13} {row['instructions']:>12,} "
+            f"{row['seconds']:>8.3f} {row['instructions_per_sec']:>11,} {rss:>10} "
+            f"{row['traced_peak_bytes'] // 1024:>11,}K {row['retained_blocks']:>9,}"
+            f"{'' if row['ok'] else '  WRONG ANSWER'}")
+
+
+def compare(old_path: str, new_path: str) -> None:
+    with open(old_path) as f:
+        old = {(row["workload"], row["backend"]): row for row in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = json.load(f)["results"]
+
+    print(f"{'workload':<22} {'backend':<13} {'old instr/sec':>13} {'new instr/sec':>13} {'change':>8}")
+    for row in new:
+        before = old.get((row["workload"], row["backend"]))
+        if before is None:
+            continue
+        change = row["instructions_per_sec"] / before["instructions_per_sec"] - 1
+        notes = []
+        if row["instructions"] != before["instructions"]:
+            notes.append(f"instructions {before['instructions']:,} -> {row['instructions']:,}")
+        if row["ok"] != before["ok"]:
+            notes.append("now right" if row["ok"] else "now WRONG")
+        print(f"{row['workload']:<22} {row['backend']:<13} {before['instructions_per_sec']:>13,} "
+              f"{row['instructions_per_sec']:>13,} {change:>+8.1%}  {', '.join(notes)}".rstrip())
+
+
+def main(repeat: int = 3, json_path: Optional[str] = None) -> bool:
+    """
+    measure the corpus, printing each row as it's done unless the JSON is
+    going to stdout; returns whether every answer was right
+    """
+    table = json_path != "-"
+    if table:
+        print(HEADER, flush=True)
+    results = []
+    for row in measure_corpus(repeat):
+        results.append(row)
+        if table:
+            print(format_row(row), flush=True)
+
+    run = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "results": results,
+    }
+    if json_path == "-":
+        json.dump(run, sys.stdout, indent=2)
+        print()
+    elif json_path is not None:
+        with open(json_path, "w") as f:
+            json.dump(run, f, indent=2)
+            f.write("\n")
+    return all(row["ok"] for row in results)
+
+
+def profile_main() -> None:
+    boost = load_program("day9/day_9_input.txt")
+    profile = Profile()
+    computer = IntcodeComputer(boost, profile=profile)
+    computer.inputs.append(2)
+    try:
+        while True:
+            computer.go()
+    except EndProgram:
+        pass
+    print(profile.report(computer.memory))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m intcode.bench")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", metavar="PATH", help="write the results as JSON, - for stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two JSON results")
+    parser.add_argument("--profile", action="store_true", help="profile BOOST instead")
+    args = parser.parse_args()
+
+    if args.profile:
+        profile_main()
+    elif args.compare:
+        compare(*args.compare)
+    elif not main(args.repeat, args.json):
+        sys.exit(1)
@@ -0,0 +1,165 @@
+"""
+Checkpoint files for long Intcode runs.
+
+    checkpoint.dump(computer.snapshot(), "breakout.icp")
+    ...
+    computer = IntcodeComputer.from_snapshot(checkpoint.load("breakout.icp"), get_input)
+
+A checkpoint holds a Snapshot: the position, relative base, step count,
+queued inputs and memory. get_input is a callback and isn't saved; whoever
+resumes supplies their own. The file is little-endian throughout:
+
+    header      magic, version, pos, relative base, steps, and the counts
+                of memory pages, stored pages, inputs and big values
+    page table  the page number of each stored page (uint32); pages that
+                are all zero aren't stored
+    inputs      the queued inputs (int64)
+    pages       PAGE_SIZE int64 cells per stored page
+    big values  cells and inputs that don't fit in 64 bits, which read as 0
+                above: (0 for memory / 1 for input, address or index,
+                length) then the value as signed little-endian bytes
+
+Everything before the big values is 8-byte aligned. load() maps the file
+and copies out only the stored pages, so resuming costs O(pages in use)
+whatever the size of memory; missing pages all share ZERO_PAGE.
+
+    python -m intcode.checkpoint breakout.icp
+"""
+
+from typing import List, Tuple
+from array import array
+import mmap
+import os
+import struct
+import sys
+
+from intcode.computer import PAGE_BITS, PAGE_SIZE, ZERO_PAGE, Page, Snapshot
+
+
+MAGIC = b"INTC"
+VERSION = 1
+
+# magic, version, reserved, pos, relative base, steps,
+# memory pages, stored pages, inputs, big values
+HEADER = struct.Struct("<4sHHqqqIIII")
+BIG_VALUE = struct.Struct("<BqI")
+PAGE_BYTES = PAGE_SIZE * 8
+
+INT64_MIN = -1 << 63
+INT64_MAX = (1 << 63) - 1
+
+MEMORY, INPUT = 0, 1
+
+
+def _int64(values) -> array:
+    """
+    ints, or little-endian bytes, as int64 cells in native order
+    """
+    cells = array("q", values)
+    if sys.byteorder == "big":
+        cells.byteswap()
+    return cells
+
+
+def _padding(size: int) -> bytes:
+    return bytes(-size % 8)
+
+
+def dumps(snapshot: Snapshot) -> bytes:
+    stored: List[Tuple[int, Page]] = [(number, page) for number, page in enumerate(snapshot.pages)
+                                      if page is not ZERO_PAGE and any(page)]
+    big: List[Tuple[int, int, int]] = []
+
+    def fit(where: int, index: int, value: int) -> int:
+        if INT64_MIN <= value <= INT64_MAX:
+            return value
+        big.append((where, index, value))
+        return 0
+
+    inputs = [fit(INPUT, i, value) for i, value in enumerate(snapshot.inputs)]
+    pages = []
+    for number, page in stored:
+        start = number << PAGE_BITS
+        pages.append(_int64(fit(MEMORY, start + i, value) for i, value in enumerate(page)).tobytes())
+
+    header = HEADER.pack(MAGIC, VERSION, 0, snapshot.pos, snapshot.relative_base, snapshot.steps,
+                         len(snapshot.pages), len(stored), len(inputs), len(big))
+    table = struct.pack(f"<{len(stored)}I", *(number for number, _ in stored))
+    parts = [header, table, _padding(len(table)), _int64(inputs).tobytes()]
+    parts.extend(pages)
+    for where, index, value in big:
+        data = value.to_bytes((value.bit_length() + 8) // 8, "little", signed=True)
+        parts.append(BIG_VALUE.pack(where, index, len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def dump(snapshot: Snapshot, path: str) -> None:
+    """
+    write the checkpoint next to path and move it into place, so a run
+    killed mid-write leaves the previous checkpoint intact
+    """
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(dumps(snapshot))
+    os.replace(temporary, path)
+
+
+def loads(data) -> Snapshot:
+    """
+    data is anything sliceable into bytes: bytes, or an mmap
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("not an Intcode checkpoint: too short")
+    (magic, version, _, pos, relative_base, steps,
+     num_pages, num_stored, num_inputs, num_big) = HEADER.unpack(data[:HEADER.size])
+    if magic != MAGIC:
+        raise ValueError(f"not an Intcode checkpoint: magic {magic!r}")
+    if version != VERSION:
+        raise ValueError(f"unsupported checkpoint version: {version}")
+
+    offset = HEADER.size
+    table = struct.unpack(f"<{num_stored}I", data[offset:offset + 4 * num_stored])
+    offset += 4 * num_stored
+    offset += -offset % 8
+    inputs = list(_int64(data[offset:offset + 8 * num_inputs]))
+    offset += 8 * num_inputs
+
+    pages: List[Page] = [ZERO_PAGE] * num_pages
+    cells = {}
+    for number in table:
+        cells[number] = _int64(data[offset:offset + PAGE_BYTES]).tolist()
+        offset += PAGE_BYTES
+
+    for _ in range(num_big):
+        where, index, length = BIG_VALUE.unpack(data[offset:offset + BIG_VALUE.size])
+        offset += BIG_VALUE.size
+        value = int.from_bytes(data[offset:offset + length], "little", signed=True)
+        offset += length
+        if where == INPUT:
+            inputs[index] = value
+        else:
+            cells[index >> PAGE_BITS][index % PAGE_SIZE] = value
+
+    for number, page in cells.items():
+        pages[number] = tuple(page)
+
+    return Snapshot(tuple(pages), pos, relative_base, tuple(inputs), steps)
+
+
+def load(path: str) -> Snapshot:
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return loads(data)
+
+
+def main(path: str) -> None:
+    snapshot = load(path)
+    stored = sum(1 for page in snapshot.pages if page is not ZERO_PAGE)
+    print(f"pos {snapshot.pos}, relative base {snapshot.relative_base}, {snapshot.steps} steps")
+    print(f"{len(snapshot.pages) << PAGE_BITS} cells in {len(snapshot.pages)} pages, {stored} stored")
+    print(f"{len(snapshot.inputs)} inputs queued")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
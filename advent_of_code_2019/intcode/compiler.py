@@ -0,0 +1,263 @@
+"""
+A basic-block compiler tier for the Intcode computer.
+
+Straight-line runs of arithmetic / compare / relative-base instructions,
+plus the jump that ends them, are turned into one Python function each,
+with every parameter mode and immediate value baked in as a constant. The
+functions live in a dispatch dict keyed by start address. Everything else
+runs in the decode-cache interpreter, which hands back to the blocks at
+every taken jump to an address that has one.
+
+Compiling costs far more than interpreting a block a few times, so a
+block is only compiled once jumps have landed on its start HOT times;
+code that runs once (day 2, an amplifier pass) never pays for it. Blocks
+don't hold on to the computer that compiled them, so they are shared:
+every computer that compiles the same instructions at the same address
+gets the one function, and a fresh computer on a program seen before
+starts with its hot loops already compiled.
+
+If anything writes into a compiled block's address range, the block is
+thrown away and its start address is left to the interpreter from then on.
+The exception is a block that stores a pointer into one of its own
+instructions' arguments and then uses it (day 13 addresses its screen
+that way): those arguments are read from memory each time instead of
+being baked in, so the block survives its own writes.
+"""
+
+from typing import Callable, Dict, List, MutableSequence, Optional, Set, Tuple
+
+from intcode.computer import IntcodeComputer, LENGTHS, PAGE_BITS
+
+
+# a compiled block takes (computer, memory, relative_base) and returns
+# (next pos, relative base, instructions executed)
+Block = Callable[[IntcodeComputer, MutableSequence[int], int], Tuple[int, int, int]]
+
+STRAIGHT_LINE = {1, 2, 7, 8, 9}
+JUMPS = {5, 6}
+
+# jumps to a start address before its block is compiled
+HOT = 16
+
+# compiled blocks kept for sharing, at most
+SHARED_BLOCKS = 4096
+
+
+class CompiledIntcodeComputer(IntcodeComputer):
+    # (start, memory size, the block's cells, None where dynamic) -> (block, source)
+    _shared: Dict[Tuple[int, int, Tuple[Optional[int], ...]], Tuple[Block, str]] = {}
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._blocks: Dict[int, Block] = {}
+        # address -> start addresses of the compiled blocks covering it
+        self._block_cover: Dict[int, List[int]] = {}
+        # start addresses that are never compiled
+        self._interpreted: Set[int] = set()
+        # start address -> jumps that have landed on it, until it's hot
+        self._heat: Dict[int, int] = {}
+        self.sources: Dict[int, str] = {}
+
+    def _invalidate(self, loc: int) -> None:
+        super()._invalidate(loc)
+        for start in self._block_cover.pop(loc, ()):
+            if self._blocks.pop(start, None) is not None:
+                self._interpreted.add(start)
+
+    def _forget_code(self, start: int, end: int) -> None:
+        # restore() replaced this memory; unlike self-modification that is
+        # no reason to stop compiling here
+        super()._forget_code(start, end)
+        for loc in range(start, end):
+            for block_start in self._block_cover.pop(loc, ()):
+                self._blocks.pop(block_start, None)
+
+    def _compile(self, pos: int) -> Optional[Block]:
+        instructions = []
+        start = pos
+        while True:
+            instruction = self._read(pos)
+            opcode = instruction % 100
+            length = LENGTHS.get(opcode)
+            if opcode not in STRAIGHT_LINE and opcode not in JUMPS:
+                break
+            modes = [instruction // 100 % 10, instruction // 1000 % 10, instruction // 10000 % 10]
+            if any(mode not in (0, 1, 2) for mode in modes[:length - 1]):
+                break
+            args = [self._read(pos + i) for i in range(1, length)]
+            instructions.append((pos, opcode, modes, args))
+            pos += length
+            if opcode in JUMPS:
+                break
+
+        if not instructions:
+            self._interpreted.add(start)
+            return None
+        starts = {instruction_pos for instruction_pos, _, _, _ in instructions}
+
+        # argument cells the block itself writes (a pointer stored into the
+        # next instruction, as in day 13's screen routines) stay live
+        written = {args[2] for _, opcode, modes, args in instructions
+                   if opcode not in JUMPS and opcode != 9 and modes[2] == 0}
+        dynamic = {cell for cell in written
+                   if start <= cell < min(pos, len(self.memory)) and cell not in starts}
+        cells = tuple(None if loc in dynamic else self.memory[loc] for loc in range(start, min(pos, len(self.memory))))
+
+        shared = CompiledIntcodeComputer._shared
+        key = (start, len(self.memory), cells)
+        found = shared.get(key)
+        if found is None:
+            source = generate(start, instructions, len(self.memory), dynamic)
+            namespace: Dict[str, Block] = {}
+            exec(compile(source, f"<intcode block {start}>", "exec"), namespace)
+            found = namespace[f"block_{start}"], source
+            if len(shared) >= SHARED_BLOCKS:
+                shared.clear()
+            shared[key] = found
+        block, source = found
+
+        self._blocks[start] = block
+        self.sources[start] = source
+        for loc in range(start, pos):
+            if loc not in dynamic:
+                self._block_cover.setdefault(loc, []).append(start)
+        self._code.update(range(start, pos))
+        return block
+
+    def _hot(self, pos: int) -> bool:
+        """
+        a jump has landed on pos: should the blocks take over?
+        """
+        if pos in self._blocks:
+            return True
+        if pos in self._interpreted:
+            return False
+        heat = self._heat.get(pos, 0) + 1
+        self._heat[pos] = heat
+        return heat >= HOT
+
+    def go(self) -> int:
+        if self.profile is not None:
+            # compiled blocks would hide the instructions inside them
+            return super().go()
+        return self._go_compiled()
+
+    def _run_blocking(self, outputs: List[int]) -> None:
+        if self.profile is not None:
+            super()._run_blocking(outputs)
+        else:
+            self._go_compiled(outputs)
+
+    def _go_compiled(self, outputs: Optional[List[int]] = None) -> Optional[int]:
+        """
+        blocks where there are any, the interpreter in between. outputs
+        works as for _go_cached().
+        """
+        blocks = self._blocks
+        hot = self._hot
+        inputs = self.inputs
+        blocking = outputs is not None and self.get_input == inputs.popleft
+
+        while True:
+            pos = self.pos
+            block = blocks.get(pos)
+            if block is None and hot(pos):
+                block = self._compile(pos)
+
+            if block is not None:
+                self.pos, self.relative_base, steps = block(self, self.memory, self.relative_base)
+                self.steps += steps
+                continue
+
+            output = self._go_cached(outputs, stop=hot)
+            if output is not None:
+                return output
+            # the interpreter stopped at a block, or is waiting for input
+            if blocking and not inputs and self._read(self.pos) % 100 == 3:
+                return None
+
+
+def generate(start: int, instructions: list, memory_size: int, dynamic: Set[int] = frozenset()) -> str:
+    """
+    Python source for one block. Position-mode addresses that were inside
+    memory at compile time are indexed directly, since memory never shrinks.
+    Arguments in dynamic (addresses of argument cells) are read from memory
+    each time the block runs rather than baked in, so the block can write
+    them without throwing itself away.
+    """
+    lines = [f"def block_{start}(computer, memory, relative_base):"]
+    emit = lines.append
+
+    def address(mode: int, arg: int, cell: int, name: str, indent: str) -> Optional[str]:
+        """
+        the name holding a relative or dynamic operand's address, or None
+        for a fixed position-mode one
+        """
+        if cell in dynamic:
+            emit(f"{indent}{name} = {'relative_base + ' if mode == 2 else ''}memory[{cell}]")
+            return name
+        if mode == 2:
+            emit(f"{indent}{name} = relative_base + {arg}")
+            return name
+        return None
+
+    def value(mode: int, arg: int, cell: int, name: str, indent: str = "    ") -> str:
+        if mode == 1:
+            return f"memory[{cell}]" if cell in dynamic else repr(arg)
+        loc = address(mode, arg, cell, name, indent)
+        if loc is None:
+            return f"memory[{arg}]" if 0 <= arg < memory_size else f"computer._read({arg})"
+        emit(f"{indent}{name} = memory[{name}] if 0 <= {name} < len(memory) else computer._read({name})")
+        return name
+
+    for count, (pos, opcode, modes, args) in enumerate(instructions, 1):
+        next_pos = pos + LENGTHS[opcode]
+
+        if opcode == 9:
+            emit(f"    relative_base += {value(modes[0], args[0], pos + 1, 'a')}")
+
+        elif opcode in JUMPS:
+            condition = "!=" if opcode == 5 else "=="
+            emit(f"    if {value(modes[0], args[0], pos + 1, 'a')} {condition} 0:")
+            target = value(modes[1], args[1], pos + 2, "b", indent="        ")
+            emit(f"        return {target}, relative_base, {count}")
+            emit(f"    return {next_pos}, relative_base, {count}")
+
+        else:
+            a = value(modes[0], args[0], pos + 1, "a")
+            b = value(modes[1], args[1], pos + 2, "b")
+            if opcode == 1:
+                result = f"{a} + {b}"
+            elif opcode == 2:
+                result = f"{a} * {b}"
+            elif opcode == 7:
+                result = f"1 if {a} < {b} else 0"
+            else:
+                result = f"1 if {a} == {b} else 0"
+
+            loc = address(modes[2], args[2], pos + 3, "c", "    ")
+            if loc is None:
+                loc = repr(args[2])
+            if loc == "c" or not 0 <= args[2] < memory_size:
+                emit(f"    if not 0 <= {loc} < len(memory):")
+                emit(f"        computer._grow({loc})")
+            emit(f"    value = {result}")
+            emit("    try:")
+            emit(f"        memory[{loc}] = value")
+            emit("    except OverflowError:")
+            emit("        memory = computer._promote()")
+            emit(f"        memory[{loc}] = value")
+            if loc == "c":
+                emit(f"    computer._dirty[c >> {PAGE_BITS}] = 1")
+            else:
+                emit(f"    computer._dirty[{args[2] >> PAGE_BITS}] = 1")
+            emit(f"    if {loc} in computer._code:")
+            emit(f"        computer._invalidate({loc})")
+            if loc not in map(repr, dynamic):
+                # the write may have changed this block's own code
+                emit(f"        return {next_pos}, relative_base, {count}")
+
+    if instructions[-1][1] not in JUMPS:
+        emit(f"    return {next_pos}, relative_base, {len(instructions)}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,649 @@
+from typing import List, Tuple, Iterable, Callable, Optional, Dict, Set, NamedTuple, Union
+from array import array
+from enum import Enum
+from collections import deque
+
+
+class Opcode(Enum):
+    ADD = 1
+    MULTIPLY = 2
+    STORE_INPUT = 3
+    SEND_TO_OUTPUT = 4
+    JUMP_IF_TRUE = 5
+    JUMP_IF_FALSE = 6
+    LESS_THAN = 7
+    EQUALS = 8
+    ADJUST_RELATIVE_BASE = 9
+
+    END_PROGRAM = 99
+
+
+Modes = List[int]
+Program = List[int]
+
+
+class EndProgram(Exception): pass
+
+
+def parse_opcode(opcode: int, num_modes: int = 3) -> Tuple[Opcode, Modes]:
+    """
+    Split an instruction into its opcode and parameter modes. The computer
+    itself decodes with plain integer arithmetic; this is for tools that
+    want the Enum (disassemblers, reports).
+    """
+    opcode_part = opcode % 100
+
+    modes: List[int] = []
+    opcode = opcode // 100
+
+    for _ in range(num_modes):
+        modes.append(opcode % 10)
+        opcode = opcode // 10
+
+    return Opcode(opcode_part), modes
+
+
+# instruction length (opcode plus parameters) for each opcode
+LENGTHS = {1: 4, 2: 4, 3: 2, 4: 2, 5: 3, 6: 3, 7: 4, 8: 4, 9: 2, 99: 1}
+
+# a decoded instruction: opcode, length, then a (mode, argument) pair for
+# each of three parameters. The argument is the value itself in immediate
+# mode, the address in position mode and the offset in relative mode.
+Decoded = Tuple[int, int, int, int, int, int, int, int]
+
+# memory is snapshotted in pages of 2 ** PAGE_BITS cells
+PAGE_BITS = 8
+PAGE_SIZE = 1 << PAGE_BITS
+ZERO_PAGE = (0,) * PAGE_SIZE
+
+Page = Tuple[int, ...]
+
+
+class Snapshot(NamedTuple):
+    """
+    A frozen computer state. Pages are immutable tuples, so snapshots (and
+    the computers restored from them) share every page neither has written.
+    """
+    pages: Tuple[Page, ...]
+    pos: int
+    relative_base: int
+    inputs: Tuple[int, ...]
+    steps: int
+
+
+def _image(program: Iterable[int], int64: bool) -> Union[array, List[int]]:
+    if int64:
+        try:
+            return array("q", program)
+        except OverflowError:
+            pass
+    return list(program)
+
+
+class IntcodeComputer:
+    """
+    Memory is a flat array('q') of 64-bit cells, which is what nearly every
+    program needs and takes half the space of a list of ints. The first
+    write of a value that doesn't fit (BOOST checks for this) promotes the
+    whole image to a list of Python ints, and it stays a list from then on;
+    results are the same either way. int64=False starts with the list.
+    Reads past the end see 0; a write past the end grows memory (at least
+    doubling it) so repeated writes into fresh memory stay amortised O(1).
+
+    Inputs come from get_input() if one is given, otherwise from the
+    self.inputs deque, which __call__ and send() extend. go() runs until
+    the next output and returns it, raising EndProgram on opcode 99.
+    run_until_blocked() instead collects every output up to the point the
+    computer needs input it hasn't got (or halts) and returns them all.
+
+    With decode_cache on (the default) each address is decoded once and
+    the result reused every time execution comes back to it. A write into
+    a cached instruction drops just that entry, so self-modifying programs
+    still see their own changes.
+
+    Writes also mark their page dirty, which lets snapshot() and restore()
+    cost O(pages touched) rather than O(memory). Snapshots share every page
+    they have in common, but a running computer's memory is one flat array,
+    not pages shared copy-on-write: from_snapshot() builds all of it. To
+    branch from one state many times, restore() its snapshot into
+    computers you keep (intcode.pool does this).
+
+    Given a profile (intcode.profiler.Profile), go() runs through it and
+    every instruction is counted; see that module.
+    """
+    def __init__(self,
+                 program: List[int],
+                 get_input: Optional[Callable[[], int]] = None,
+                 decode_cache: bool = True,
+                 profile=None,
+                 int64: bool = True) -> None:
+        # padded to whole pages; the padding reads as 0 either way
+        self.memory = _image(program, int64)
+        self.memory.extend([0] * (-len(self.memory) % PAGE_SIZE))
+        self.inputs = deque()
+        self.get_input = get_input if get_input is not None else self.inputs.popleft
+        self.pos = 0
+        self.relative_base = 0
+        self.steps = 0
+        self.halted = False
+        self.decode_cache = decode_cache
+        self.profile = profile
+        self.int64 = int64
+        self._decoded: Dict[int, Decoded] = {}
+        # every address covered by some entry of _decoded
+        self._code: Set[int] = set()
+        # _pages[i] is the tuple memory page i equals, unless _dirty[i] is set
+        self._pages: List[Optional[Page]] = []
+        self._dirty = bytearray(b"\x01" * (len(self.memory) >> PAGE_BITS))
+
+    def snapshot(self) -> Snapshot:
+        memory = self.memory
+        pages = self._pages
+        pages.extend([None] * ((len(memory) >> PAGE_BITS) - len(pages)))
+        dirty = self._dirty
+        for page, flag in enumerate(dirty):
+            if flag:
+                start = page << PAGE_BITS
+                pages[page] = tuple(memory[start:start + PAGE_SIZE])
+        # cleared in place: the go() loops hold a reference to it
+        dirty[:] = bytes(len(dirty))
+
+        return Snapshot(tuple(pages), self.pos, self.relative_base, tuple(self.inputs), self.steps)
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """
+        Put this computer back into the snapshotted state, rewriting only
+        the pages that differ from it. get_input is left alone.
+        """
+        memory = self.memory
+        pages = self._pages
+        dirty = self._dirty
+        size = max(len(memory), len(snapshot.pages) << PAGE_BITS)
+        if len(memory) < size:
+            # memory never shrinks; pages the snapshot doesn't have are zero
+            self._grow(size - 1)
+        pages.extend([None] * ((len(memory) >> PAGE_BITS) - len(pages)))
+
+        for page in range(len(pages)):
+            wanted = snapshot.pages[page] if page < len(snapshot.pages) else ZERO_PAGE
+            if dirty[page] or pages[page] is not wanted:
+                start = page << PAGE_BITS
+                if type(memory) is array:
+                    try:
+                        wanted_cells = array("q", wanted)
+                    except OverflowError:
+                        memory = self._promote()
+                        wanted_cells = wanted
+                else:
+                    wanted_cells = wanted
+                memory[start:start + PAGE_SIZE] = wanted_cells
+                pages[page] = wanted
+                self._forget_code(start, start + PAGE_SIZE)
+        dirty[:] = bytes(len(dirty))
+
+        self.pos = snapshot.pos
+        self.relative_base = snapshot.relative_base
+        self.steps = snapshot.steps
+        self.halted = False
+        self.inputs.clear()
+        self.inputs.extend(snapshot.inputs)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot, get_input: Optional[Callable[[], int]] = None, **options) -> "IntcodeComputer":
+        computer = cls([], get_input, **options)
+        computer.restore(snapshot)
+        return computer
+
+    def save(self):
+        return [self.snapshot(), self.get_input]
+
+    @classmethod
+    def load(cls, snapshot, get_input):
+        return cls.from_snapshot(snapshot, get_input)
+
+    def _read(self, loc: int) -> int:
+        if loc < 0:
+            raise ValueError(f"negative address: {loc}")
+        memory = self.memory
+        return memory[loc] if loc < len(memory) else 0
+
+    def _grow(self, loc: int) -> None:
+        if loc < 0:
+            raise ValueError(f"negative address: {loc}")
+        memory = self.memory
+        size = max(loc + 1, 2 * len(memory))
+        size += -size % PAGE_SIZE
+        self._dirty.extend(b"\x01" * ((size - len(memory)) >> PAGE_BITS))
+        # extend in place so the go() loop's local reference stays valid
+        memory.extend([0] * (size - len(memory)))
+
+    def _promote(self) -> List[int]:
+        """
+        a value too big for 64 bits is about to be written: switch memory
+        to a list of Python ints. Loops holding the old memory in a local
+        must pick up the one returned.
+        """
+        self.memory = list(self.memory)
+        return self.memory
+
+    def _decode(self, pos: int) -> Decoded:
+        instruction = self._read(pos)
+        opcode = instruction % 100
+        length = LENGTHS.get(opcode)
+        if length is None:
+            raise ValueError(f"invalid opcode: {opcode}")
+
+        decoded = [opcode, length, 0, 0, 0, 0, 0, 0]
+        modes = instruction // 100
+        for i in range(1, length):
+            mode = modes % 10
+            modes //= 10
+            if mode not in (0, 1, 2):
+                raise ValueError(f"unknown mode: {mode}")
+            decoded[2 * i] = mode
+            decoded[2 * i + 1] = self._read(pos + i)
+
+        entry = tuple(decoded)
+        self._decoded[pos] = entry
+        self._code.update(range(pos, pos + length))
+        return entry
+
+    def _invalidate(self, loc: int) -> None:
+        """
+        loc was just written; drop every cached instruction that covers it.
+        """
+        decoded = self._decoded
+        for start in range(loc - 3, loc + 1):
+            entry = decoded.get(start)
+            if entry is not None and start + entry[1] > loc:
+                del decoded[start]
+        self._code.discard(loc)
+
+    def _value(self, mode: int, arg: int) -> int:
+        if mode == 1:
+            return arg
+        return self._read(arg + self.relative_base if mode == 2 else arg)
+
+    def _write(self, loc: int, value: int) -> None:
+        memory = self.memory
+        if not 0 <= loc < len(memory):
+            self._grow(loc)
+        try:
+            memory[loc] = value
+        except OverflowError:
+            self._promote()[loc] = value
+        self._dirty[loc >> PAGE_BITS] = 1
+        if loc in self._code:
+            self._invalidate(loc)
+
+    def step(self) -> Optional[int]:
+        """
+        Execute the single instruction at self.pos. Returns the value if it
+        was an output, otherwise None. Slow next to go(), but handy for
+        tools that need to stop between instructions.
+        """
+        pos = self.pos
+        entry = self._decoded.get(pos)
+        if entry is None:
+            entry = self._decode(pos)
+        opcode, length, mode1, arg1, mode2, arg2, mode3, arg3 = entry
+
+        if opcode == 99:
+            raise EndProgram
+
+        output = None
+        next_pos = pos + length
+
+        if opcode == 3:
+            loc = arg1 + self.relative_base if mode1 == 2 else arg1
+            self._write(loc, self.get_input())
+        elif opcode == 4:
+            output = self._value(mode1, arg1)
+        elif opcode == 5 or opcode == 6:
+            if (self._value(mode1, arg1) != 0) == (opcode == 5):
+                next_pos = self._value(mode2, arg2)
+        elif opcode == 9:
+            self.relative_base += self._value(mode1, arg1)
+        else:
+            value1 = self._value(mode1, arg1)
+            value2 = self._value(mode2, arg2)
+            if opcode == 1:
+                value = value1 + value2
+            elif opcode == 2:
+                value = value1 * value2
+            elif opcode == 7:
+                value = 1 if value1 < value2 else 0
+            else:
+                value = 1 if value1 == value2 else 0
+            self._write(arg3 + self.relative_base if mode3 == 2 else arg3, value)
+
+        self.pos = next_pos
+        self.steps += 1
+        return output
+
+    def _forget_code(self, start: int, end: int) -> None:
+        """
+        memory in [start, end) was replaced wholesale; drop cached
+        instructions that overlap it
+        """
+        decoded = self._decoded
+        for pos in range(start - 3, end):
+            entry = decoded.get(pos)
+            if entry is not None and pos + entry[1] > start:
+                del decoded[pos]
+        self._code.difference_update(range(start, end))
+
+    def __call__(self, input_values: Iterable[int] = ()) -> int:
+        self.inputs.extend(input_values)
+        return self.go()
+
+    def send(self, data: Union[str, bytes, Iterable[int]]) -> None:
+        """
+        queue input; a string is sent as its ASCII codes
+        """
+        if isinstance(data, str):
+            data = data.encode("ascii")
+        self.inputs.extend(data)
+
+    def run_until_blocked(self) -> Union[array, List[int]]:
+        """
+        Run until the computer wants input that isn't queued, or halts
+        (which sets self.halted), and return everything it output on the
+        way: an array('q'), or like memory a list of ints if some output
+        doesn't fit in 64 bits. With a get_input callback the computer
+        never blocks on input.
+        """
+        outputs: List[int] = []
+        blocking = self.get_input == self.inputs.popleft
+        try:
+            self._run_blocking(outputs)
+        except EndProgram:
+            self.halted = True
+        except IndexError:
+            # go() popped an empty inputs deque; the computer is still
+            # on the input instruction
+            if not blocking or self.inputs:
+                raise
+        return _image(outputs, True)
+
+    def _run_blocking(self, outputs: List[int]) -> None:
+        """
+        run_until_blocked()'s loop: append outputs until the computer halts
+        or needs input that isn't queued. A subclass with a faster way to
+        do that than one go() per output overrides this.
+        """
+        if type(self).go is IntcodeComputer.go and self.profile is None:
+            if self.decode_cache:
+                self._go_cached(outputs)
+            else:
+                self._go_uncached(outputs)
+        else:
+            # a subclass with its own go(): one output at a time
+            while True:
+                outputs.append(self.go())
+
+    def go(self) -> int:
+        if self.profile is not None:
+            return self.profile.go(self)
+        if self.decode_cache:
+            return self._go_cached()
+        return self._go_uncached()
+
+    def _go_cached(self,
+                   outputs: Optional[List[int]] = None,
+                   stop: Optional[Callable[[int], bool]] = None) -> Optional[int]:
+        """
+        With outputs given, outputs are appended to it instead of returned,
+        and the loop returns None when it needs input that isn't queued.
+        With stop given, every taken jump asks stop(target) and the loop
+        returns None, at the target, if it says so; the compiler tier uses
+        this to take over where it has a block.
+        """
+        memory = self.memory
+        pos = self.pos
+        relative_base = self.relative_base
+        steps = self.steps
+        read = self._read
+        decoded = self._decoded
+        decode = self._decode
+        code = self._code
+        dirty = self._dirty
+        page_bits = PAGE_BITS
+        inputs = self.inputs
+        blocking = outputs is not None and self.get_input == inputs.popleft
+
+        try:
+            while True:
+                entry = decoded.get(pos)
+                if entry is None:
+                    entry = decode(pos)
+                opcode, length, mode1, arg1, mode2, arg2, mode3, arg3 = entry
+
+                if opcode == 99:
+                    raise EndProgram
+
+                if opcode == 3:
+                    if blocking and not inputs:
+                        return None
+                    loc = arg1 + relative_base if mode1 == 2 else arg1
+                    value = self.get_input()
+                    steps += 1
+                    if not 0 <= loc < len(memory):
+                        self._grow(loc)
+                    try:
+                        memory[loc] = value
+                    except OverflowError:
+                        memory = self._promote()
+                        memory[loc] = value
+                    dirty[loc >> page_bits] = 1
+                    if loc in code:
+                        self._invalidate(loc)
+                    pos += 2
+                    continue
+
+                steps += 1
+
+                if mode1 == 1:
+                    value1 = arg1
+                else:
+                    loc = arg1 + relative_base if mode1 == 2 else arg1
+                    value1 = memory[loc] if 0 <= loc < len(memory) else read(loc)
+
+                if opcode == 1 or opcode == 2 or opcode == 7 or opcode == 8:
+                    if mode2 == 1:
+                        value2 = arg2
+                    else:
+                        loc = arg2 + relative_base if mode2 == 2 else arg2
+                        value2 = memory[loc] if 0 <= loc < len(memory) else read(loc)
+
+                    if opcode == 1:
+                        value = value1 + value2
+                    elif opcode == 2:
+                        value = value1 * value2
+                    elif opcode == 7:
+                        value = 1 if value1 < value2 else 0
+                    else:
+                        value = 1 if value1 == value2 else 0
+
+                    loc = arg3 + relative_base if mode3 == 2 else arg3
+                    if not 0 <= loc < len(memory):
+                        self._grow(loc)
+                    try:
+                        memory[loc] = value
+                    except OverflowError:
+                        memory = self._promote()
+                        memory[loc] = value
+                    dirty[loc >> page_bits] = 1
+                    if loc in code:
+                        self._invalidate(loc)
+                    pos += 4
+
+                elif opcode == 5 or opcode == 6:
+                    if (value1 != 0) == (opcode == 5):
+                        if mode2 == 1:
+                            pos = arg2
+                        else:
+                            loc = arg2 + relative_base if mode2 == 2 else arg2
+                            pos = memory[loc] if 0 <= loc < len(memory) else read(loc)
+                        if stop is not None and stop(pos):
+                            return None
+                    else:
+                        pos += 3
+
+                elif opcode == 4:
+                    pos += 2
+                    if outputs is None:
+                        return value1
+                    outputs.append(value1)
+
+                else:
+                    # opcode 9
+                    relative_base += value1
+                    pos += 2
+        finally:
+            # if get_input() raised, pos still points at the input
+            # instruction, so the computer can be resumed once input arrives
+            self.pos = pos
+            self.relative_base = relative_base
+            self.steps = steps
+
+    def _go_uncached(self, outputs: Optional[List[int]] = None) -> Optional[int]:
+        memory = self.memory
+        pos = self.pos
+        relative_base = self.relative_base
+        steps = self.steps
+        read = self._read
+        code = self._code
+        dirty = self._dirty
+        page_bits = PAGE_BITS
+        inputs = self.inputs
+        blocking = outputs is not None and self.get_input == inputs.popleft
+
+        try:
+            while True:
+                instruction = memory[pos] if 0 <= pos < len(memory) else read(pos)
+                opcode = instruction % 100
+
+                if opcode == 99:
+                    raise EndProgram
+
+                # resolve parameters to addresses; an immediate parameter
+                # is its own address
+                mode = instruction // 100 % 10
+                if mode > 2:
+                    raise ValueError(f"unknown mode: {mode}")
+                loc1 = pos + 1
+                if mode != 1:
+                    loc1 = memory[loc1] if 0 <= loc1 < len(memory) else read(loc1)
+                    if mode == 2:
+                        loc1 += relative_base
+
+                if opcode == 1 or opcode == 2 or opcode == 7 or opcode == 8:
+                    mode = instruction // 1000 % 10
+                    if mode > 2:
+                        raise ValueError(f"unknown mode: {mode}")
+                    loc2 = pos + 2
+                    if mode != 1:
+                        loc2 = memory[loc2] if 0 <= loc2 < len(memory) else read(loc2)
+                        if mode == 2:
+                            loc2 += relative_base
+                    mode = instruction // 10000 % 10
+                    if mode > 2:
+                        raise ValueError(f"unknown mode: {mode}")
+                    loc3 = memory[pos + 3] if 0 <= pos + 3 < len(memory) else read(pos + 3)
+                    if mode == 2:
+                        loc3 += relative_base
+
+                    value1 = memory[loc1] if 0 <= loc1 < len(memory) else read(loc1)
+                    value2 = memory[loc2] if 0 <= loc2 < len(memory) else read(loc2)
+
+                    if opcode == 1:
+                        value = value1 + value2
+                    elif opcode == 2:
+                        value = value1 * value2
+                    elif opcode == 7:
+                        value = 1 if value1 < value2 else 0
+                    else:
+                        value = 1 if value1 == value2 else 0
+
+                    if not 0 <= loc3 < len(memory):
+                        self._grow(loc3)
+                    try:
+                        memory[loc3] = value
+                    except OverflowError:
+                        memory = self._promote()
+                        memory[loc3] = value
+                    dirty[loc3 >> page_bits] = 1
+                    if loc3 in code:
+                        self._invalidate(loc3)
+                    pos += 4
+                    steps += 1
+
+                elif opcode == 5 or opcode == 6:
+                    mode = instruction // 1000 % 10
+                    if mode > 2:
+                        raise ValueError(f"unknown mode: {mode}")
+                    loc2 = pos + 2
+                    if mode != 1:
+                        loc2 = memory[loc2] if 0 <= loc2 < len(memory) else read(loc2)
+                        if mode == 2:
+                            loc2 += relative_base
+
+                    value1 = memory[loc1] if 0 <= loc1 < len(memory) else read(loc1)
+
+                    if (value1 != 0) == (opcode == 5):
+                        pos = memory[loc2] if 0 <= loc2 < len(memory) else read(loc2)
+                    else:
+                        pos += 3
+                    steps += 1
+
+                elif opcode == 3:
+                    if blocking and not inputs:
+                        return None
+                    value = self.get_input()
+                    if not 0 <= loc1 < len(memory):
+                        self._grow(loc1)
+                    try:
+                        memory[loc1] = value
+                    except OverflowError:
+                        memory = self._promote()
+                        memory[loc1] = value
+                    dirty[loc1 >> page_bits] = 1
+                    if loc1 in code:
+                        self._invalidate(loc1)
+                    pos += 2
+                    steps += 1
+
+                elif opcode == 4:
+                    pos += 2
+                    steps += 1
+                    value = memory[loc1] if 0 <= loc1 < len(memory) else read(loc1)
+                    if outputs is None:
+                        return value
+                    outputs.append(value)
+
+                elif opcode == 9:
+                    relative_base += memory[loc1] if 0 <= loc1 < len(memory) else read(loc1)
+                    pos += 2
+                    steps += 1
+
+                else:
+                    raise ValueError(f"invalid opcode: {opcode}")
+        finally:
+            # if get_input() raised, pos still points at the input
+            # instruction, so the computer can be resumed once input arrives
+            self.pos = pos
+            self.relative_base = relative_base
+            self.steps = steps
+
+
+def run(program: Program, inputs: Iterable[int] = (), computer_class=IntcodeComputer) -> List[int]:
+    outputs = []
+    computer = computer_class(program)
+
+    try:
+        while True:
+            outputs.append(computer(inputs))
+            inputs = ()
+    except EndProgram:
+        return outputs
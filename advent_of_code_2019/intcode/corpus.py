@@ -0,0 +1,164 @@
+"""
+Real Intcode programs with known inputs and answers, for benchmarking.
+
+    for workload in WORKLOADS:
+        result, steps = workload.run(IntcodeComputer, workload.program())
+        assert result == workload.expected
+
+Programs are read from the day directories: the puzzle input files where
+there is one, otherwise the list literal a day script assigns its program
+to. The literal is found by parsing the script, not importing it, since
+importing a day script solves the puzzle.
+
+run(new, program) builds every computer it needs with new(), so a backend
+is anything that takes a program: a computer class, or functools.partial
+of one with options. It returns the workload's answer and the instructions
+executed, summed over all the computers it used. Loading the program is
+kept out of run() so that timing it times only Intcode.
+"""
+
+from typing import Any, Callable, List, NamedTuple, Tuple, Union
+import ast
+import itertools
+import os
+
+from intcode.arcade import Arcade
+from intcode.computer import IntcodeComputer, EndProgram, Program
+from intcode.droid import explore
+
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+NewComputer = Callable[[Program], IntcodeComputer]
+# (answer, instructions executed)
+Run = Callable[[NewComputer, Program], Tuple[Any, int]]
+
+
+def load_program(path: str) -> Program:
+    with open(os.path.join(ROOT, path)) as f:
+        return [int(n) for n in f.read().strip().split(",")]
+
+
+def program_literal(path: str, name: str) -> Program:
+    """
+    the last list literal assigned to name at the top level of a script
+    """
+    with open(os.path.join(ROOT, path)) as f:
+        tree = ast.parse(f.read(), path)
+    found = None
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and isinstance(node.value, ast.List)
+                and any(isinstance(target, ast.Name) and target.id == name for target in node.targets)):
+            found = node.value
+    if found is None:
+        raise ValueError(f"no list assigned to {name} in {path}")
+    return ast.literal_eval(found)
+
+
+def run_to_end(computer: IntcodeComputer) -> List[int]:
+    outputs = []
+    try:
+        while True:
+            outputs.append(computer.go())
+    except EndProgram:
+        return outputs
+
+
+def gravity_assist(new: NewComputer, program: Program) -> Tuple[Any, int]:
+    """
+    day 2: the noun and verb that leave 19690720 at address 0, found by
+    trying them in order, a fresh computer each
+    """
+    steps = 0
+    for noun, verb in itertools.product(range(100), repeat=2):
+        patched = list(program)
+        patched[1:3] = [noun, verb]
+        computer = new(patched)
+        run_to_end(computer)
+        steps += computer.steps
+        if computer.memory[0] == 19690720:
+            return 100 * noun + verb, steps
+    raise RuntimeError("no noun and verb give 19690720")
+
+
+def diagnostics(system_id: int) -> Run:
+    """
+    day 5: the TEST program's outputs for one system ID
+    """
+    def run(new: NewComputer, program: Program) -> Tuple[Any, int]:
+        computer = new(program)
+        computer.inputs.append(system_id)
+        return run_to_end(computer), computer.steps
+    return run
+
+
+def amplifiers(new: NewComputer, program: Program) -> Tuple[Any, int]:
+    """
+    day 7: the highest signal out of five amplifiers in series, over every
+    order of the phase settings 0-4
+    """
+    best, steps = None, 0
+    for phases in itertools.permutations(range(5)):
+        signal = 0
+        for phase in phases:
+            computer = new(program)
+            computer.inputs.extend([phase, signal])
+            signal = computer.go()
+            steps += computer.steps
+        best = signal if best is None else max(best, signal)
+    return best, steps
+
+
+def boost(mode: int) -> Run:
+    """
+    day 9: BOOST in test mode (1) or sensor boost mode (2)
+    """
+    def run(new: NewComputer, program: Program) -> Tuple[Any, int]:
+        computer = new(program)
+        computer.inputs.append(mode)
+        return run_to_end(computer), computer.steps
+    return run
+
+
+def breakout(new: NewComputer, program: Program) -> Tuple[Any, int]:
+    """
+    day 13: a whole game of breakout, the paddle following the ball
+    """
+    arcade = Arcade(program, computer_class=new)
+    return arcade.play(), arcade.computer.steps
+
+
+def maze(new: NewComputer, program: Program) -> Tuple[Any, int]:
+    """
+    day 15: map the maze with one droid (intcode.droid.explore); the answer
+    is the number of open cells and where the oxygen is
+    """
+    computer = new(program)
+    found = explore(computer)
+    return (len(found.open_cells), found.oxygen), computer.steps
+
+
+class Workload(NamedTuple):
+    name: str
+    # where the program is: a file, or (script, variable name)
+    source: Union[str, Tuple[str, str]]
+    run: Run
+    expected: Any
+
+    def program(self) -> Program:
+        if isinstance(self.source, str):
+            return load_program(self.source)
+        return program_literal(*self.source)
+
+
+WORKLOADS = [
+    Workload("day02 gravity assist", ("day2/day02.py", "program"), gravity_assist, 3749),
+    Workload("day05 diagnostics 1", ("day5/day05.py", "PROGRAM"), diagnostics(1),
+             [0, 0, 0, 0, 0, 0, 0, 0, 0, 11193703]),
+    Workload("day05 diagnostics 5", ("day5/day05.py", "PROGRAM"), diagnostics(5), [12410607]),
+    Workload("day07 amplifiers", ("day7/day07.py", "PROGRAM"), amplifiers, 21000),
+    Workload("day09 BOOST 1", "day9/day_9_input.txt", boost(1), [4080871669]),
+    Workload("day09 BOOST 2", "day9/day_9_input.txt", boost(2), [75202]),
+    Workload("day13 breakout", "day13/day_13_input.txt", breakout, 19210),
+    Workload("day15 maze", ("day15/day15.py", "PROGRAM"), maze, (799, (-20, -18))),
+]
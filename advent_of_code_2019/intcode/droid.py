@@ -0,0 +1,85 @@
+"""
+The day 15 repair droid, driven over its Intcode program.
+
+    maze = explore(IntcodeComputer(program))
+
+explore() maps the whole maze with one droid and returns the open
+locations and where the oxygen system is, with the droid's start at
+(0, 0) and north as +y. The day script finds its paths on that map; the
+benchmark corpus (intcode.corpus) runs the same exploration, so the two
+can't drift apart.
+"""
+
+from typing import List, NamedTuple, Set, Tuple
+from enum import Enum
+
+from intcode.computer import IntcodeComputer
+
+
+class Direction(Enum):
+    NORTH = 1
+    SOUTH = 2
+    WEST = 3
+    EAST = 4
+
+class Status(Enum):
+    WALL = 0
+    MOVED = 1
+    OXYGEN = 2
+
+DIRECTIONS = [Direction.NORTH, Direction.SOUTH, Direction.WEST, Direction.EAST]
+ANTI_DIRECTIONS = [Direction.SOUTH, Direction.NORTH, Direction.EAST, Direction.WEST]
+DELTAS = [(0, 1), (0, -1), (-1, 0), (1, 0)]
+
+
+Location = Tuple[int, int]
+
+
+class Maze(NamedTuple):
+    open_cells: Set[Location]
+    oxygen: Location
+
+
+def explore(computer: IntcodeComputer) -> Maze:
+    """
+    map the whole maze with one droid: depth first, stepping back the way
+    it came (the anti-direction) when a location has nothing new around it.
+    Walls are remembered so no direction is tried twice. computer runs the
+    droid's program from the start.
+    """
+    open_cells = {(0, 0)}
+    walls: Set[Location] = set()
+    oxygen = None
+
+    x, y = 0, 0
+    # the directions still to try at each location on the current path,
+    # and the way back from each step along it
+    untried = [iter(zip(DIRECTIONS, ANTI_DIRECTIONS, DELTAS))]
+    path: List[Tuple[Direction, int, int]] = []
+
+    while untried:
+        for direction, anti, (dx, dy) in untried[-1]:
+            new_loc = (x + dx, y + dy)
+            if new_loc in open_cells or new_loc in walls:
+                continue
+            status = Status(computer([direction.value]))
+            if status == Status.WALL:
+                walls.add(new_loc)
+                continue
+            if status == Status.OXYGEN:
+                oxygen = new_loc
+            open_cells.add(new_loc)
+            x, y = new_loc
+            path.append((anti, dx, dy))
+            untried.append(iter(zip(DIRECTIONS, ANTI_DIRECTIONS, DELTAS)))
+            break
+        else:
+            untried.pop()
+            if path:
+                anti, dx, dy = path.pop()
+                computer([anti.value])
+                x, y = x - dx, y - dy
+
+    if oxygen is None:
+        raise RuntimeError("no oxygen system in the maze")
+    return Maze(open_cells, oxygen)
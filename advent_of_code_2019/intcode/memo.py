@@ -0,0 +1,255 @@
+"""
+Memoised call frames for Intcode.
+
+Intcode has no call instruction, but compiled Intcode keeps a stack in
+relative-mode memory: a subroutine starts with `ADJUST_RELATIVE_BASE n`
+(n > 0, immediate) to claim a frame and ends with the matching `-n`,
+after which it jumps back through the return address its caller left on
+the stack. BOOST's recursive routine at 922 is one of these.
+
+MemoisingIntcodeComputer watches for that discipline. A frame runs from
+the `+n` at its entry until the relative base is back where it was; while
+it runs, every memory access is recorded. When it ends, the frame is kept
+if it can be replayed:
+
+  - it did no input or output, and no code was overwritten;
+  - every relative-mode access was at or above the frame's base and every
+    position-mode access below it, so the stack and the globals can't
+    alias however deep the call is;
+  - every cell it read before writing (its arguments) was on the stack.
+
+Writes to globals are allowed, since they are replayed (BOOST's scratch
+cell 63 is one). The next time a frame starts at the same address with
+the same argument values, it is skipped: its writes are applied, the
+instruction pointer jumps to where it ended, and steps advances by the
+number of instructions it took. A frame's record includes the frames it
+called, so naive recursion collapses to one evaluation per argument.
+
+With trace on, each frame kept or reused is logged.
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import logging
+
+from intcode.computer import IntcodeComputer, EndProgram
+
+
+class Frame:
+    def __init__(self, entry: int, base: int, steps: int) -> None:
+        self.entry = entry
+        self.base = base
+        self.steps = steps
+        # loc -> value, for cells read before the frame wrote them
+        self.reads: Dict[int, int] = {}
+        # loc -> last value written
+        self.writes: Dict[int, int] = {}
+        self.lowest_relative: Optional[int] = None
+        self.highest_absolute: Optional[int] = None
+        self.pure = True
+
+    def access(self, loc: int, relative: bool) -> None:
+        if relative:
+            if self.lowest_relative is None or loc < self.lowest_relative:
+                self.lowest_relative = loc
+        elif self.highest_absolute is None or loc > self.highest_absolute:
+            self.highest_absolute = loc
+
+    def read(self, loc: int, value: int) -> None:
+        if loc not in self.writes and loc not in self.reads:
+            self.reads[loc] = value
+
+    def absorb(self, child: "Frame") -> None:
+        """
+        fold a finished (or abandoned) inner frame into this one
+        """
+        for loc, value in child.reads.items():
+            self.read(loc, value)
+        self.writes.update(child.writes)
+        if child.lowest_relative is not None:
+            self.access(child.lowest_relative, True)
+        if child.highest_absolute is not None:
+            self.access(child.highest_absolute, False)
+        self.pure = self.pure and child.pure
+
+    def replayable(self) -> bool:
+        base = self.base
+        return (self.pure
+                and (self.lowest_relative is None or self.lowest_relative >= base)
+                and (self.highest_absolute is None or self.highest_absolute < base)
+                and all(loc >= base for loc in self.reads))
+
+
+class Memo(NamedTuple):
+    # stack writes are offsets from the frame's base, global writes are
+    # absolute addresses
+    stack_writes: Tuple[Tuple[int, int], ...]
+    global_writes: Tuple[Tuple[int, int], ...]
+    highest_absolute: int
+    exit: int
+    steps: int
+
+
+class MemoisingIntcodeComputer(IntcodeComputer):
+    def __init__(self, *args, trace: bool = False, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.trace = trace
+        self.reused = 0
+        # entry address -> argument offsets -> argument values -> memo
+        self._memos: Dict[int, Dict[Tuple[int, ...], Dict[Tuple[int, ...], Memo]]] = {}
+        self._frames: List[Frame] = []
+
+    def _invalidate(self, loc: int) -> None:
+        # self-modifying code: nothing recorded so far can be trusted
+        super()._invalidate(loc)
+        self._memos.clear()
+        for frame in self._frames:
+            frame.pure = False
+
+    def _forget_code(self, start: int, end: int) -> None:
+        super()._forget_code(start, end)
+        self._memos.clear()
+        self._frames.clear()
+
+    def _load(self, mode: int, arg: int) -> int:
+        if mode == 1:
+            return arg
+        loc = arg + self.relative_base if mode == 2 else arg
+        value = self._read(loc)
+        if self._frames:
+            frame = self._frames[-1]
+            frame.access(loc, mode == 2)
+            frame.read(loc, value)
+        return value
+
+    def _store(self, mode: int, arg: int, value: int) -> None:
+        loc = arg + self.relative_base if mode == 2 else arg
+        self._write(loc, value)
+        if self._frames:
+            frame = self._frames[-1]
+            frame.access(loc, mode == 2)
+            frame.writes[loc] = value
+
+    def _reuse(self, entry: int) -> bool:
+        """
+        at a frame entry: if a memo matches the arguments now on the stack,
+        apply it and return True
+        """
+        base = self.relative_base
+        for offsets, memos in self._memos.get(entry, {}).items():
+            arguments = tuple(self._read(base + offset) for offset in offsets)
+            memo = memos.get(arguments)
+            if memo is None or memo.highest_absolute >= base:
+                continue
+
+            frame = self._frames[-1] if self._frames else None
+            if frame is not None:
+                for offset, value in zip(offsets, arguments):
+                    frame.read(base + offset, value)
+            for offset, value in memo.stack_writes:
+                self._write(base + offset, value)
+                if frame is not None:
+                    frame.writes[base + offset] = value
+            for loc, value in memo.global_writes:
+                self._write(loc, value)
+                if frame is not None:
+                    frame.writes[loc] = value
+            if frame is not None:
+                # everything the memo touched on the stack is at or above base
+                frame.access(base, True)
+                if memo.highest_absolute >= 0:
+                    frame.access(memo.highest_absolute, False)
+
+            self.pos = memo.exit
+            self.steps += memo.steps
+            self.reused += 1
+            if self.trace:
+                logging.info(f"reused frame {entry} {dict(zip(offsets, arguments))}"
+                             f" -> {memo.exit}, skipped {memo.steps} instructions")
+            return True
+        return False
+
+    def _leave(self) -> None:
+        """
+        the relative base is back to where the innermost frame started
+        """
+        frame = self._frames.pop()
+        if self._frames:
+            self._frames[-1].absorb(frame)
+        if not frame.replayable():
+            return
+
+        base = frame.base
+        offsets = tuple(loc - base for loc in frame.reads)
+        values = tuple(frame.reads.values())
+        memo = Memo(stack_writes=tuple((loc - base, value) for loc, value in frame.writes.items() if loc >= base),
+                    global_writes=tuple((loc, value) for loc, value in frame.writes.items() if loc < base),
+                    highest_absolute=-1 if frame.highest_absolute is None else frame.highest_absolute,
+                    exit=self.pos,
+                    steps=self.steps - frame.steps)
+        self._memos.setdefault(frame.entry, {}).setdefault(offsets, {})[values] = memo
+        if self.trace:
+            logging.info(f"memoised frame {frame.entry} {dict(zip(offsets, values))}"
+                         f" -> {memo.exit}, {memo.steps} instructions")
+
+    def go(self) -> int:
+        frames = self._frames
+
+        while True:
+            pos = self.pos
+            entry = self._decoded.get(pos)
+            if entry is None:
+                entry = self._decode(pos)
+            opcode, length, mode1, arg1, mode2, arg2, mode3, arg3 = entry
+
+            if opcode == 99:
+                raise EndProgram
+
+            if opcode == 9 and mode1 == 1 and arg1 > 0:
+                if self._reuse(pos):
+                    continue
+                frames.append(Frame(pos, self.relative_base, self.steps))
+
+            next_pos = pos + length
+            output = None
+
+            if opcode == 3:
+                for frame in frames:
+                    frame.pure = False
+                self._store(mode1, arg1, self.get_input())
+            elif opcode == 4:
+                for frame in frames:
+                    frame.pure = False
+                output = self._load(mode1, arg1)
+            elif opcode == 5 or opcode == 6:
+                if (self._load(mode1, arg1) != 0) == (opcode == 5):
+                    next_pos = self._load(mode2, arg2)
+            elif opcode == 9:
+                self.relative_base += self._load(mode1, arg1)
+            else:
+                value1 = self._load(mode1, arg1)
+                value2 = self._load(mode2, arg2)
+                if opcode == 1:
+                    value = value1 + value2
+                elif opcode == 2:
+                    value = value1 * value2
+                elif opcode == 7:
+                    value = 1 if value1 < value2 else 0
+                else:
+                    value = 1 if value1 == value2 else 0
+                self._store(mode3, arg3, value)
+
+            self.pos = next_pos
+            self.steps += 1
+
+            if opcode == 9:
+                # a frame that drops below its own base was never a frame
+                while frames and self.relative_base < frames[-1].base:
+                    frame = frames.pop()
+                    frame.pure = False
+                    if frames:
+                        frames[-1].absorb(frame)
+                if frames and self.relative_base == frames[-1].base:
+                    self._leave()
+
+            if output is not None:
+                return output
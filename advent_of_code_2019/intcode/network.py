@@ -0,0 +1,199 @@
+"""
+Networks of Intcode computers joined by channels (day 7's feedback loop,
+and anything shaped like it).
+
+Every node reads from one inbox channel. Its outputs go to every channel
+it is connected to, or to its outbox if it isn't connected to anything.
+Channels can be bounded; a node whose output has nowhere to go holds on
+to it and stops until there is room.
+
+The scheduler only resumes a node that can make progress: one whose inbox
+just got a value, or one that was stuck on a full channel that just
+drained. A node runs until it needs input that isn't there, is stuck on
+output, or halts. Network.run() keeps going until nothing can move, then
+reports which nodes are still waiting for input; with expect_halt it
+raises Deadlock instead if any are.
+
+AsyncNetwork puts an asyncio face on the same scheduler.
+"""
+
+from typing import Deque, Dict, List, Optional, Set, Type
+from collections import deque
+import asyncio
+
+from intcode.computer import IntcodeComputer, EndProgram, Program
+
+
+class Blocked(Exception):
+    """
+    raised out of a node's get_input when its inbox is empty; the computer
+    stays on the input instruction and picks up from there next time
+    """
+
+
+class Deadlock(Exception): pass
+
+
+class Channel:
+    def __init__(self, capacity: Optional[int] = None) -> None:
+        self.values: Deque[int] = deque()
+        self.capacity = capacity
+        self.consumer: Optional["Node"] = None
+        # nodes holding an output they couldn't push here
+        self.stuck_producers: Set["Node"] = set()
+
+    def full(self) -> bool:
+        return self.capacity is not None and len(self.values) >= self.capacity
+
+
+class Node:
+    def __init__(self, name: str, computer: IntcodeComputer, inbox: Channel) -> None:
+        self.name = name
+        self.computer = computer
+        self.inbox = inbox
+        self.targets: List[Channel] = []
+        self.outbox: Deque[int] = deque()
+        self.held: Optional[int] = None
+        self.last_output: Optional[int] = None
+        self.halted = False
+
+    def __repr__(self) -> str:
+        return f"Node({self.name!r})"
+
+
+class Network:
+    def __init__(self, computer_class: Type[IntcodeComputer] = IntcodeComputer) -> None:
+        self.computer_class = computer_class
+        self.nodes: Dict[str, Node] = {}
+        self._ready: Deque[Node] = deque()
+        self._queued: Set[Node] = set()
+
+    def add(self, name: str, program: Program, capacity: Optional[int] = None) -> Node:
+        inbox = Channel(capacity)
+        node = Node(name, None, inbox)
+        node.computer = self.computer_class(program, lambda: self._next_input(node))
+        inbox.consumer = node
+        self.nodes[name] = node
+        self._wake(node)
+        return node
+
+    def connect(self, source: str, target: str) -> None:
+        self.nodes[source].targets.append(self.nodes[target].inbox)
+
+    def send(self, name: str, *values: int) -> None:
+        """
+        values from outside the network; these ignore the inbox's capacity
+        """
+        node = self.nodes[name]
+        node.inbox.values.extend(values)
+        self._wake(node)
+
+    @property
+    def halted(self) -> bool:
+        return all(node.halted for node in self.nodes.values())
+
+    def run(self, expect_halt: bool = False) -> List[str]:
+        """
+        run until no node can make progress; returns the names of the nodes
+        left waiting (for input, or for room in a full channel)
+        """
+        ready = self._ready
+        while ready:
+            node = ready.popleft()
+            self._queued.discard(node)
+            if not node.halted:
+                self._resume(node)
+
+        waiting = [name for name, node in self.nodes.items() if not node.halted]
+        if expect_halt and waiting:
+            raise Deadlock(f"nodes still waiting: {', '.join(waiting)}")
+        return waiting
+
+    def _wake(self, node: Node) -> None:
+        if node not in self._queued:
+            self._queued.add(node)
+            self._ready.append(node)
+
+    def _next_input(self, node: Node) -> int:
+        inbox = node.inbox
+        if not inbox.values:
+            raise Blocked
+        value = inbox.values.popleft()
+        for producer in inbox.stuck_producers:
+            self._wake(producer)
+        inbox.stuck_producers.clear()
+        return value
+
+    def _resume(self, node: Node) -> None:
+        while True:
+            if node.held is not None:
+                full = [channel for channel in node.targets if channel.full()]
+                if full:
+                    for channel in full:
+                        channel.stuck_producers.add(node)
+                    return
+
+                value, node.held = node.held, None
+                node.last_output = value
+                if node.targets:
+                    for channel in node.targets:
+                        channel.values.append(value)
+                        self._wake(channel.consumer)
+                else:
+                    node.outbox.append(value)
+
+            try:
+                node.held = node.computer.go()
+            except Blocked:
+                return
+            except EndProgram:
+                node.halted = True
+                return
+
+
+class AsyncNetwork:
+    """
+    Drive a Network from asyncio code: await send() to feed a node (waiting
+    while its inbox is full) and await receive() for the next value a node
+    puts in its outbox. Only sends can change what the network will do, so
+    waiters are woken after each one.
+
+    receive() waits for as long as it takes for a send to give its node
+    something to output. Whether some task will ever send is up to the
+    caller, so deadlock detection is opt-in: given a timeout, receive()
+    raises Deadlock once that many seconds pass without a send.
+    """
+    def __init__(self, network: Network) -> None:
+        self.network = network
+        self._sent = asyncio.Condition()
+
+    async def send(self, name: str, *values: int) -> None:
+        node = self.network.nodes[name]
+        for value in values:
+            self.network.run()
+            while node.inbox.full():
+                if node.halted:
+                    raise EndProgram
+                async with self._sent:
+                    await self._sent.wait()
+                self.network.run()
+            node.inbox.values.append(value)
+            self.network._wake(node)
+            self.network.run()
+            async with self._sent:
+                self._sent.notify_all()
+
+    async def receive(self, name: str, timeout: Optional[float] = None) -> int:
+        node = self.network.nodes[name]
+        # checked and waited on under the lock, so no send slips in between
+        async with self._sent:
+            while True:
+                self.network.run()
+                if node.outbox:
+                    return node.outbox.popleft()
+                if node.halted:
+                    raise EndProgram
+                try:
+                    await asyncio.wait_for(self._sent.wait(), timeout)
+                except asyncio.TimeoutError:
+                    raise Deadlock(f"{name} is waiting and nothing sent for {timeout}s") from None
@@ -0,0 +1,811 @@
+"""
+A static optimiser for Intcode programs.
+
+    optimised, report = optimise(program)
+
+The program is analysed from address 0 without running it. Every
+reachable instruction gets an abstract state: the relative base as an
+interval, and for each memory cell either a known value or "unknown".
+Input makes a cell unknown; so does a write through a relative base that
+isn't known exactly, for every cell it could reach. Conditional jumps
+whose condition is known only get the successor they will take.
+Instructions are decoded from that state rather than the program image,
+so a program that patches its own arguments can still be analysed.
+
+From that the optimiser:
+
+  - turns every read of a known value into an immediate parameter;
+  - folds known conditional jumps (always taken becomes `1105,1,target`,
+    never taken becomes removable);
+  - finds stores that are overwritten before anything reads them;
+  - replaces each run of removable instructions (dead stores, branches
+    that are never taken, relative-base adjustments by a known amount,
+    optionally ending in a jump that's always taken) with one
+    ADJUST_RELATIVE_BASE and one jump past it;
+  - zeroes memory that is neither executed nor read any more, and drops
+    the trailing zeros.
+
+Equivalent here means: the same outputs for the same inputs. Final memory
+is not preserved, so don't optimise a program whose answer is left in
+memory (day 2).
+
+The program is returned unchanged, and the report says why, if the opcode
+at a reachable address may change or a jump goes to an address that isn't
+known. Of the 2019 programs that rules out day 5 (it stores an opcode that
+depends on the input), day 7 (a jump table indexed by the phase setting),
+day 13 once it has quarters (it writes through pointers it computes) and
+day 19 (it calls through a function pointer it computes). Instructions
+whose cells are written, or read as data (BOOST outputs some of its own
+code), are never rewritten.
+
+The one jump to an unknown address that is accepted is a subroutine
+return, and only once it is confirmed: the jump reads its target from
+where the call pushed the return address, nothing since the call can have
+overwritten that, and the relative base is back where the call left it.
+
+    python -m intcode.optimiser day9/day_9_input.txt
+"""
+
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+import math
+import sys
+
+from intcode.computer import LENGTHS, Program
+
+
+INF = math.inf
+
+# an instruction taking more visits than this has its relative base widened
+WIDEN_AFTER = 4
+
+# an unknown write anywhere in a range wider than this forgets everything
+# from the bottom of the range up, rather than each cell in it
+FORGET_RANGE = 64
+
+# where a return address is kept: ("abs", address), or ("frame", offset)
+# from the relative base the subroutine was called with
+Location = Tuple[str, int]
+
+
+class Instruction(NamedTuple):
+    opcode: int
+    length: int
+    modes: Tuple[int, int, int]
+    # None for an argument the program may have overwritten with something unknown
+    args: Tuple[Optional[int], Optional[int], Optional[int]]
+
+
+def decode(word: int, args: Tuple[Optional[int], ...]) -> Optional[Instruction]:
+    opcode = word % 100
+    length = LENGTHS.get(opcode)
+    if length is None:
+        return None
+    modes = (word // 100 % 10, word // 1000 % 10, word // 10000 % 10)
+    if any(mode not in (0, 1, 2) for mode in modes[:length - 1]):
+        return None
+    if opcode in (1, 2, 7, 8) and modes[2] == 1 or opcode == 3 and modes[0] == 1:
+        return None
+    return Instruction(opcode, length, modes, tuple(args))
+
+
+class State:
+    """
+    What is known just before an instruction. The relative base is
+    [rb_low, rb_high] above the one the current subroutine was called with,
+    and that was in [entry_low, entry_high] (0 for the main program). A cell
+    in `cells` holds that value (None for unknown); any other cell at or
+    above `havoc` is unknown, and the rest still hold the program's initial
+    values. `ret` is where the subroutine's return address is, for as long
+    as nothing may have overwritten it.
+    """
+    __slots__ = ("rb_low", "rb_high", "entry_low", "entry_high", "cells", "havoc", "ret")
+
+    def __init__(self, rb_low: float, rb_high: float, entry_low: float, entry_high: float,
+                 cells: Dict[int, Optional[int]], havoc: float, ret: Optional[Location]) -> None:
+        self.rb_low = rb_low
+        self.rb_high = rb_high
+        self.entry_low = entry_low
+        self.entry_high = entry_high
+        self.cells = cells
+        self.havoc = havoc
+        self.ret = ret
+
+    def copy(self) -> "State":
+        return State(self.rb_low, self.rb_high, self.entry_low, self.entry_high,
+                     dict(self.cells), self.havoc, self.ret)
+
+    @property
+    def base(self) -> Optional[int]:
+        return int(self.rb_low) if self.rb_low == self.rb_high else None
+
+    def get(self, program: Program, loc: Optional[int]) -> Optional[int]:
+        if loc is None or loc < 0:
+            return None
+        if loc in self.cells:
+            return self.cells[loc]
+        if loc >= self.havoc:
+            return None
+        return program[loc] if loc < len(program) else 0
+
+    def clobber(self, start: float) -> None:
+        """
+        something unknown was written at or above start
+        """
+        start = max(start, 0)
+        self.cells = {loc: value for loc, value in self.cells.items() if loc < start}
+        self.havoc = min(self.havoc, start)
+
+    def store(self, access: "Access", value: Optional[int]) -> None:
+        if self.ret is not None and access.may_hit(self, self.ret):
+            self.ret = None
+        if access.address is not None:
+            self.cells[access.address] = value
+        elif access.highest - access.lowest > FORGET_RANGE:
+            self.clobber(access.lowest)
+        else:
+            for loc in range(max(int(access.lowest), 0), int(access.highest) + 1):
+                self.cells[loc] = None
+
+    def enter(self, ret: Optional[Location]) -> "State":
+        """
+        the state at the start of a subroutine called from here
+        """
+        return State(0, 0, self.entry_low + self.rb_low, self.entry_high + self.rb_high,
+                     dict(self.cells), self.havoc, ret)
+
+    def join(self, other: "State", program: Program) -> "State":
+        havoc = min(self.havoc, other.havoc)
+        cells = {}
+        for loc in set(self.cells) | set(other.cells):
+            value = self.get(program, loc)
+            cells[loc] = value if value == other.get(program, loc) else None
+        return State(min(self.rb_low, other.rb_low), max(self.rb_high, other.rb_high),
+                     min(self.entry_low, other.entry_low), max(self.entry_high, other.entry_high),
+                     cells, havoc, self.ret if self.ret == other.ret else None)
+
+    def widen(self, previous: "State") -> None:
+        if self.rb_low < previous.rb_low:
+            self.rb_low = -INF
+        if self.rb_high > previous.rb_high:
+            self.rb_high = INF
+        if self.entry_low < previous.entry_low:
+            self.entry_low = -INF
+        if self.entry_high > previous.entry_high:
+            self.entry_high = INF
+
+    def __eq__(self, other: object) -> bool:
+        return (isinstance(other, State)
+                and (self.rb_low, self.rb_high, self.entry_low, self.entry_high, self.havoc, self.ret, self.cells)
+                == (other.rb_low, other.rb_high, other.entry_low, other.entry_high, other.havoc, other.ret, other.cells))
+
+
+class Access(NamedTuple):
+    """
+    one memory parameter: its address if known, and the range it lies in.
+    A relative one also has the range of its offset from the relative base
+    the subroutine was called with.
+    """
+    address: Optional[int]
+    lowest: float
+    highest: float
+    frame_low: Optional[float] = None
+    frame_high: Optional[float] = None
+
+    def location(self) -> Optional[Location]:
+        if self.frame_low is not None:
+            return ("frame", int(self.frame_low)) if self.frame_low == self.frame_high else None
+        return ("abs", self.address) if self.address is not None else None
+
+    def may_hit(self, state: State, location: Location) -> bool:
+        kind, n = location
+        if kind == "abs":
+            return self.lowest <= n <= self.highest
+        if self.frame_low is not None:
+            return self.frame_low <= n <= self.frame_high
+        return self.lowest <= state.entry_high + n and self.highest >= state.entry_low + n
+
+
+class Effect(NamedTuple):
+    """
+    what an instruction does, given the state it runs in
+    """
+    values: Tuple[Optional[int], ...]    # value of each parameter, None if unknown
+    reads: Tuple[Access, ...]             # memory parameters read, with their index
+    read_params: Tuple[int, ...]
+    write: Optional[Access]
+    delta: Optional[int]                  # opcode 9: the adjustment
+    taken: Optional[bool]                 # jumps: whether it jumps, None if unknown
+    target: Optional[int]                 # jumps: where to, None if unknown
+    source: Optional[Location]            # jumps: where the target is read from
+
+
+def _access(state: State, mode: int, arg: Optional[int]) -> Access:
+    if mode == 0:
+        return Access(arg, arg, arg) if arg is not None else Access(None, 0, INF)
+    if arg is None:
+        return Access(None, 0, INF, -INF, INF)
+    frame_low, frame_high = state.rb_low + arg, state.rb_high + arg
+    lowest, highest = state.entry_low + frame_low, state.entry_high + frame_high
+    address = int(lowest) if lowest == highest else None
+    return Access(address, lowest, highest, frame_low, frame_high)
+
+
+def effect(program: Program, pos: int, instruction: Instruction, state: State) -> Effect:
+    opcode, length, modes, args = instruction
+    values: List[Optional[int]] = []
+    reads: List[Access] = []
+    read_params: List[int] = []
+    write = None
+
+    params = length - 1
+    if opcode in (1, 2, 7, 8):
+        write = _access(state, modes[2], args[2])
+        params = 2
+    elif opcode == 3:
+        write = _access(state, modes[0], args[0])
+        params = 0
+
+    for i in range(params):
+        if modes[i] == 1:
+            values.append(args[i])
+            continue
+        access = _access(state, modes[i], args[i])
+        reads.append(access)
+        read_params.append(i)
+        values.append(state.get(program, access.address))
+
+    delta = values[0] if opcode == 9 else None
+    taken = target = source = None
+    if opcode in (5, 6):
+        if values[0] is not None:
+            taken = (values[0] != 0) == (opcode == 5)
+        target = values[1]
+        if modes[1] == 1:
+            source = ("abs", pos + 2)
+        else:
+            source = reads[read_params.index(1)].location()
+        if taken is False:
+            # the target is only read when the jump is taken
+            index = read_params.index(1) if 1 in read_params else None
+            if index is not None:
+                del reads[index], read_params[index]
+
+    return Effect(tuple(values), tuple(reads), tuple(read_params), write, delta, taken, target, source)
+
+
+def stored_value(opcode: int, result: Effect) -> Optional[int]:
+    """
+    the value an instruction writes, if it writes a known one
+    """
+    if opcode not in (1, 2, 7, 8):
+        return None
+    first, second = result.values
+    if first is None or second is None:
+        return None
+    if opcode == 1:
+        return first + second
+    if opcode == 2:
+        return first * second
+    if opcode == 7:
+        return 1 if first < second else 0
+    return 1 if first == second else 0
+
+
+def _after(program: Program, instruction: Instruction, state: State, result: Effect) -> State:
+    """
+    the state after an instruction that doesn't jump
+    """
+    state = state.copy()
+    opcode = instruction.opcode
+    if result.write is not None:
+        state.store(result.write, stored_value(opcode, result))
+    elif opcode == 9:
+        if result.delta is not None:
+            state.rb_low += result.delta
+            state.rb_high += result.delta
+        else:
+            state.rb_low, state.rb_high = -INF, INF
+    return state
+
+
+class Writes(NamedTuple):
+    """
+    What a subroutine may write, its callees included. Writes through the
+    relative base (into stack frames) are kept apart from the rest: by
+    address, with the lowest of the unknown ones, and as the lowest offset
+    from the relative base the subroutine was called with.
+    """
+    cells: FrozenSet[int]
+    cells_from: float
+    stack: FrozenSet[int]
+    stack_from: float
+    frame_from: float
+
+    @staticmethod
+    def of(access: Access) -> "Writes":
+        if access.frame_low is None:
+            if access.address is not None:
+                return NOTHING._replace(cells=frozenset([access.address]))
+            return NOTHING._replace(cells_from=max(access.lowest, 0))
+        if access.address is not None:
+            return NOTHING._replace(stack=frozenset([access.address]), frame_from=access.frame_low)
+        return NOTHING._replace(stack_from=max(access.lowest, 0), frame_from=access.frame_low)
+
+    def merge(self, other: "Writes") -> "Writes":
+        return Writes(self.cells | other.cells, min(self.cells_from, other.cells_from),
+                      self.stack | other.stack, min(self.stack_from, other.stack_from),
+                      min(self.frame_from, other.frame_from))
+
+    def shifted(self, rb_low: float) -> "Writes":
+        """
+        as seen by a caller whose relative base is at least rb_low
+        """
+        if self.frame_from == INF:
+            return self
+        return self._replace(frame_from=rb_low + self.frame_from)
+
+    def may_hit(self, state: State, location: Location) -> bool:
+        """
+        whether a call made in state may overwrite the caller's location
+        """
+        kind, n = location
+        if kind == "abs":
+            return n in self.cells or n in self.stack or n >= min(self.cells_from, self.stack_from)
+        if self.frame_from < INF and n >= state.rb_low + self.frame_from:
+            return True
+        low, high = state.entry_low + n, state.entry_high + n
+        return self.cells_from < INF and self.cells_from <= high or any(low <= loc <= high for loc in self.cells)
+
+
+NOTHING = Writes(frozenset(), INF, frozenset(), INF, INF)
+
+
+class Analysis:
+    """
+    The fixpoint of the abstract states over every reachable instruction.
+
+    Instructions are decoded from the state rather than the program image,
+    so a program may patch its own arguments. It is given up on (`gave_up`
+    says why) if the opcode at a reachable address may change, or if a
+    jump goes to an address that isn't known and isn't a return.
+
+    A call is a jump that is always taken, to a known address, straight
+    after (and only reachable from) an instruction that stores the address
+    just past the jump: the return address. A return is a jump through the
+    subroutine's return address, with the relative base back where the
+    call left it, and nothing since the call able to overwrite it; this is
+    checked, not assumed. Execution after a call carries on from the state
+    at the call, less whatever the subroutine and its callees may write.
+    The analysis is repeated until those summaries stop growing.
+    """
+    def __init__(self, program: Program) -> None:
+        self.program = program
+        summaries: Dict[int, Writes] = {}
+        while True:
+            self._run(summaries)
+            grown = dict(summaries)
+            for target, writes in self.summaries().items():
+                grown[target] = writes.merge(summaries.get(target, NOTHING))
+            if grown == summaries:
+                break
+            summaries = grown
+        self.gave_up = self._check()
+
+        # for liveness, a return may go back to any call
+        for jump in self.returns:
+            self.successors[jump] |= self.return_points
+
+    def writes(self) -> Tuple[Set[int], float]:
+        """
+        every cell a reachable instruction may write: the known addresses,
+        and the lowest of the unknown ones
+        """
+        written = set()
+        written_from = INF
+        for result in self.effects.values():
+            if result.write is not None:
+                if result.write.address is not None:
+                    written.add(result.write.address)
+                else:
+                    written_from = min(written_from, max(result.write.lowest, 0))
+        return written, written_from
+
+    def summaries(self) -> Dict[int, Writes]:
+        """
+        what each subroutine called may write, its callees included
+        """
+        own: Dict[int, Writes] = {}
+        # subroutine -> (the relative base at a call it makes, the callee)
+        nested: Dict[int, List[Tuple[float, int]]] = {}
+        for target in set(self.calls.values()):
+            writes = NOTHING
+            calls = []
+            seen = {target}
+            stack = [target]
+            while stack:
+                pos = stack.pop()
+                result = self.effects.get(pos)
+                if result is not None and result.write is not None:
+                    writes = writes.merge(Writes.of(result.write))
+                if pos in self.calls:
+                    calls.append((self.states[pos].rb_low, self.calls[pos]))
+                    following = {pos + self.instructions[pos].length}
+                else:
+                    following = self.successors.get(pos, set())
+                for successor in following - seen:
+                    seen.add(successor)
+                    stack.append(successor)
+            own[target], nested[target] = writes, calls
+
+        found = dict(own)
+        rounds = 0
+        changed = True
+        while changed:
+            changed = False
+            rounds += 1
+            for target, writes in own.items():
+                for rb_low, callee in nested[target]:
+                    writes = writes.merge(found[callee].shifted(rb_low))
+                if rounds > WIDEN_AFTER and writes.frame_from < found[target].frame_from:
+                    writes = writes._replace(frame_from=-INF)
+                if writes != found[target]:
+                    found[target] = writes
+                    changed = True
+        return found
+
+    def _run(self, summaries: Dict[int, Writes]) -> None:
+        program = self.program
+        self.instructions: Dict[int, Instruction] = {}
+        self.states: Dict[int, State] = {0: State(0, 0, 0, 0, {}, INF, None)}
+        self.effects: Dict[int, Effect] = {}
+        # address -> addresses execution can go to next
+        self.successors: Dict[int, Set[int]] = {}
+        # call -> the subroutine it calls
+        self.calls: Dict[int, int] = {}
+        self.return_points: Set[int] = set()
+        self.returns: Set[int] = set()
+        # jumps to an address that isn't known, and isn't a return
+        self.computed: Set[int] = set()
+        # addresses reached whose opcode isn't known
+        self.unknown: Set[int] = set()
+        # address -> (the instruction before it, the known value it stores, where)
+        self.pushed: Dict[int, Tuple[int, int, Location]] = {}
+        visits: Dict[int, int] = {}
+        worklist = [0]
+
+        def arrive(pos: int, state: State) -> None:
+            old = self.states.get(pos)
+            if old is not None:
+                new = old.join(state, program)
+                visits[pos] = visits.get(pos, 0) + 1
+                if visits[pos] > WIDEN_AFTER:
+                    new.widen(old)
+                if new == old:
+                    return
+                state = new
+            self.states[pos] = state
+            worklist.append(pos)
+
+        def returned(call: int, pos: int) -> None:
+            state = self.states[call].copy()
+            writes = summaries.get(self.calls[call], NOTHING)
+            if state.ret is not None and writes.may_hit(state, state.ret):
+                state.ret = None
+            for loc in writes.cells | writes.stack:
+                state.cells[loc] = None
+            state.clobber(min(writes.cells_from, writes.stack_from))
+            arrive(pos, state)
+
+        while worklist:
+            pos = worklist.pop()
+            state = self.states[pos]
+            self.calls.pop(pos, None)
+            self.returns.discard(pos)
+            self.computed.discard(pos)
+            self.successors[pos] = set()
+
+            self.instructions.pop(pos, None)
+            self.effects.pop(pos, None)
+            word = state.get(program, pos)
+            if word is None:
+                self.unknown.add(pos)
+                continue
+            instruction = decode(word, tuple(state.get(program, pos + i) for i in range(1, 4)))
+            if instruction is None:
+                continue
+            self.instructions[pos] = instruction
+            next_pos = pos + instruction.length
+            result = effect(program, pos, instruction, state)
+            self.effects[pos] = result
+
+            successors = self.successors[pos]
+            after = state
+            if instruction.opcode == 99:
+                pass
+            elif instruction.opcode in (5, 6):
+                if result.taken is not True:
+                    successors.add(next_pos)
+                if result.taken is not False:
+                    if result.source is not None and result.source == state.ret and state.base == 0:
+                        self.returns.add(pos)
+                    elif result.target is not None:
+                        successors.add(result.target)
+                    else:
+                        self.computed.add(pos)
+                push = self.pushed.get(pos)
+                if result.taken is True and result.target is not None and pos not in self.returns \
+                        and push is not None and push[1] == next_pos:
+                    kind, n = push[2]
+                    if kind == "frame":
+                        ret = ("frame", n - state.base) if state.base is not None else None
+                    else:
+                        ret = push[2]
+                    self.calls[pos] = result.target
+                    self.return_points.add(next_pos)
+                    arrive(result.target, state.enter(ret))
+                    returned(pos, next_pos)
+                    continue
+            else:
+                successors.add(next_pos)
+                value = stored_value(instruction.opcode, result)
+                location = result.write.location() if result.write is not None else None
+                if value is not None and location is not None:
+                    self.pushed[next_pos] = (pos, value, location)
+                else:
+                    self.pushed.pop(next_pos, None)
+                after = _after(program, instruction, state, result)
+
+            for successor in successors:
+                arrive(successor, after.copy())
+
+    def _check(self) -> Optional[str]:
+        """
+        why the analysis can't be trusted, or None if it can
+        """
+        if self.unknown:
+            pos = min(self.unknown)
+            writers = [writer for writer, result in sorted(self.effects.items())
+                       if result.write is not None and result.write.lowest <= pos <= result.write.highest]
+            reason = f"the instruction at {pos} may be overwritten"
+            if writers:
+                reason += f" (by {', '.join(map(str, writers))})"
+            return reason
+        if self.computed:
+            return f"the jump at {min(self.computed)} goes to an address computed at run time"
+        for call in sorted(self.calls):
+            pusher = self.pushed[call][0]
+            if call in self.return_points or any(
+                    call in successors for pos, successors in self.successors.items() if pos != pusher):
+                return f"the call at {call} can be reached without pushing its return address"
+        return None
+
+    def cells(self, pos: int) -> range:
+        return range(pos, pos + self.instructions[pos].length)
+
+
+class Report:
+    def __init__(self, program: Program) -> None:
+        self.size_before = len(program)
+        self.size_after = len(program)
+        self.reachable = 0
+        self.gave_up: Optional[str] = None
+        self.calls = 0
+        self.returns = 0
+        self.immediates = 0
+        # address -> True if always taken, False if never
+        self.folded: Dict[int, bool] = {}
+        self.dead_stores: List[int] = []
+        # (start, instructions replaced, instructions emitted)
+        self.runs: List[Tuple[int, int, int]] = []
+        self.zeroed = 0
+
+    def __str__(self) -> str:
+        if self.gave_up is not None:
+            return f"not optimised: {self.gave_up}"
+        lines = [
+            f"{self.size_before} cells -> {self.size_after} cells, {self.reachable} reachable instructions",
+            f"{self.calls} calls, {self.returns} returns through the address their call pushed",
+            f"{self.immediates} reads of known values made immediate",
+            f"{len(self.folded)} conditional jumps folded: "
+            + ", ".join(f"{pos} ({'always' if taken else 'never'} taken)"
+                        for pos, taken in sorted(self.folded.items())),
+            f"{len(self.dead_stores)} dead stores: " + ", ".join(map(str, self.dead_stores)),
+        ]
+        for start, replaced, emitted in self.runs:
+            lines.append(f"  {start}: {replaced} instructions replaced by {emitted}")
+        lines.append(f"{self.zeroed} cells no longer executed or read zeroed")
+        return "\n".join(lines)
+
+
+def optimise(program: Program) -> Tuple[Program, Report]:
+    report = Report(program)
+    analysis = Analysis(program)
+    instructions = analysis.instructions
+    effects = analysis.effects
+    report.reachable = len(instructions)
+
+    # every cell a reachable instruction can read as data
+    read: Set[int] = set()
+    read_from = INF
+    for result in effects.values():
+        for access in result.reads:
+            if access.address is not None:
+                read.add(access.address)
+            else:
+                read_from = min(read_from, max(access.lowest, 0))
+
+    if analysis.gave_up is not None:
+        report.gave_up = analysis.gave_up
+        return list(program), report
+    report.calls = len(analysis.calls)
+    report.returns = len(analysis.returns)
+
+    written, written_from = analysis.writes()
+
+    # cells belonging to more than one instruction (a jump into the middle
+    # of another instruction) are left alone too
+    owners: Dict[int, int] = {}
+    for pos in instructions:
+        for cell in analysis.cells(pos):
+            owners[cell] = owners.get(cell, 0) + 1
+
+    def rewritable(pos: int) -> bool:
+        return not any(cell in read or cell >= read_from or owners[cell] > 1
+                       or cell in written or cell >= written_from
+                       for cell in analysis.cells(pos))
+
+    def known(pos: int, param: int) -> bool:
+        return rewritable(pos) and effects[pos].values[param] is not None
+
+    # liveness: a cell is live if some path reads it before writing it,
+    # including as part of an instruction (a patched argument). A read of a
+    # known value doesn't count where it will become immediate.
+    uses: Dict[int, Set[int]] = {}
+    use_from: Dict[int, float] = {}
+    defs: Dict[int, Optional[int]] = {}
+    for pos, result in effects.items():
+        cells = set(analysis.cells(pos))
+        lowest = INF
+        for access, param in zip(result.reads, result.read_params):
+            if known(pos, param):
+                continue
+            if access.address is not None:
+                cells.add(access.address)
+            else:
+                lowest = min(lowest, max(access.lowest, 0))
+        uses[pos] = cells
+        use_from[pos] = lowest
+        defs[pos] = result.write.address if result.write is not None else None
+
+    live_in: Dict[int, Tuple[Set[int], float]] = {pos: (set(), INF) for pos in instructions}
+    changed = True
+    while changed:
+        changed = False
+        for pos in sorted(instructions, reverse=True):
+            cells, lowest = set(), INF
+            for successor in analysis.successors[pos]:
+                if successor in live_in:
+                    successor_cells, successor_lowest = live_in[successor]
+                    cells |= successor_cells
+                    lowest = min(lowest, successor_lowest)
+            if defs[pos] is not None:
+                cells.discard(defs[pos])
+            cells |= uses[pos]
+            lowest = min(lowest, use_from[pos])
+            if (cells, lowest) != live_in[pos]:
+                live_in[pos] = (cells, lowest)
+                changed = True
+
+    def live_out(pos: int, cell: int) -> bool:
+        for successor in analysis.successors[pos]:
+            if successor in live_in:
+                cells, lowest = live_in[successor]
+                if cell in cells or cell >= lowest:
+                    return True
+        return False
+
+    # what can go: a store nobody reads, a jump that is never taken, a
+    # relative-base adjustment by a known amount
+    removable: Set[int] = set()
+    for pos, instruction in instructions.items():
+        if not rewritable(pos):
+            continue
+        result = effects[pos]
+        opcode = instruction.opcode
+        if opcode in (1, 2, 7, 8) and result.write.address is not None \
+                and not live_out(pos, result.write.address):
+            removable.add(pos)
+        elif opcode in (5, 6) and result.taken is False:
+            removable.add(pos)
+        elif opcode == 9 and result.delta is not None:
+            removable.add(pos)
+
+    entries = {0} | analysis.return_points | {
+        result.target for result in effects.values() if result.target is not None}
+
+    optimised = list(program)
+    executed: Set[int] = set()
+    skipped: Set[int] = set()
+
+    for pos in sorted(instructions):
+        if pos in skipped:
+            continue
+        instruction = instructions[pos]
+        result = effects[pos]
+
+        # a run of removable instructions starting here
+        run: List[int] = []
+        end = pos
+        while end in removable and (end == pos or end not in entries):
+            run.append(end)
+            end += instructions[end].length
+        destination = end
+        last = end
+        if run and end in instructions and end not in entries and rewritable(end) \
+                and effects[end].taken is True and effects[end].target is not None:
+            run.append(end)
+            destination = effects[end].target
+            last = end + instructions[end].length
+
+        if run:
+            delta = sum(effects[p].delta for p in run if instructions[p].opcode == 9)
+            emitted = [109, delta] if delta else []
+            count = len(emitted) // 2
+            if destination != pos + len(emitted) or not emitted:
+                emitted.extend([1105, 1, destination])
+                count += 1
+            if count < len(run) and len(emitted) <= last - pos \
+                    and not entries.intersection(range(pos + 1, last)):
+                optimised[pos:pos + len(emitted)] = emitted
+                executed.update(range(pos, pos + len(emitted)))
+                skipped.update(run)
+                report.runs.append((pos, len(run), count))
+                for p in run:
+                    if instructions[p].opcode in (5, 6):
+                        if instructions[p].modes[0] != 1:
+                            report.folded[p] = effects[p].taken
+                    elif instructions[p].opcode != 9:
+                        report.dead_stores.append(p)
+                continue
+
+        if not rewritable(pos):
+            executed.update(analysis.cells(pos))
+            continue
+
+        modes = list(instruction.modes)
+        args = list(instruction.args)
+        if instruction.opcode in (5, 6) and result.taken is True and result.target is not None:
+            if instruction.modes[0] != 1:
+                report.folded[pos] = True
+            modes, args = [1, 1, 0], [1, result.target, 0]
+            optimised[pos] = 1105
+        else:
+            for param in range(len(result.values)):
+                if modes[param] != 1 and result.values[param] is not None:
+                    modes[param], args[param] = 1, result.values[param]
+                    report.immediates += 1
+            optimised[pos] = instruction.opcode + 100 * modes[0] + 1000 * modes[1] + 10000 * modes[2]
+        for i in range(1, instruction.length):
+            optimised[pos + i] = args[i - 1]
+        executed.update(analysis.cells(pos))
+
+    for cell in range(len(optimised)):
+        if optimised[cell] and cell not in executed and cell not in read and cell < read_from:
+            optimised[cell] = 0
+            report.zeroed += 1
+    while optimised and optimised[-1] == 0:
+        optimised.pop()
+    report.size_after = len(optimised)
+
+    return optimised, report
+
+
+def main(path: str) -> None:
+    with open(path) as f:
+        program = [int(n) for n in f.read().strip().split(",")]
+    _, report = optimise(program)
+    print(report)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
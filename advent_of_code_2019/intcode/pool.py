@@ -0,0 +1,52 @@
+"""
+A pool of computers that all start from the same program image.
+
+    pool = Pool(program)
+    with pool.computer() as computer:
+        computer.inputs.extend([noun, verb])
+        ...
+
+The image is a Snapshot taken once, so its pages are immutable tuples that
+every computer in the pool shares. release() (or leaving the with block)
+resets a computer with restore(), which rewrites only the pages it dirtied
+since it was handed out, and keeps it for the next acquire(). A probe or
+sweep that runs the same program thousands of times therefore allocates
+memory for as many computers as are out at once, and resetting one costs
+O(pages written), not O(program).
+"""
+
+from typing import Callable, Iterator, List, Optional
+from contextlib import contextmanager
+
+from intcode.computer import IntcodeComputer, Program
+
+
+class Pool:
+    def __init__(self, program: Program, computer_class=IntcodeComputer, **options) -> None:
+        self.computer_class = computer_class
+        self.options = options
+        self.image = computer_class(program, **options).snapshot()
+        self._idle: List[IntcodeComputer] = []
+
+    def acquire(self, get_input: Optional[Callable[[], int]] = None) -> IntcodeComputer:
+        """
+        a computer in the program's starting state, reading from get_input
+        if given and otherwise from its (empty) inputs deque
+        """
+        if self._idle:
+            computer = self._idle.pop()
+            computer.get_input = get_input if get_input is not None else computer.inputs.popleft
+            return computer
+        return self.computer_class.from_snapshot(self.image, get_input, **self.options)
+
+    def release(self, computer: IntcodeComputer) -> None:
+        computer.restore(self.image)
+        self._idle.append(computer)
+
+    @contextmanager
+    def computer(self, get_input: Optional[Callable[[], int]] = None) -> Iterator[IntcodeComputer]:
+        computer = self.acquire(get_input)
+        try:
+            yield computer
+        finally:
+            self.release(computer)
@@ -0,0 +1,131 @@
+"""
+An opt-in execution profile for the Intcode computer.
+
+    profile = Profile()
+    computer = IntcodeComputer(program, profile=profile)
+    ...
+    print(profile.report(computer.memory))
+
+A computer with a profile runs its go() through Profile.go(), which steps
+one instruction at a time and counts instructions per opcode, hits per
+address and taken / not taken per jump, and splits wall time between
+executing and waiting in input instructions. Without a profile the only
+cost is one attribute check per go() call, not per instruction.
+
+Several computers (a network, or ones restored from one snapshot) can share a
+Profile; their counts are added together.
+"""
+
+from typing import Counter as CounterType, Dict, List, Sequence
+from collections import Counter
+import time
+
+from intcode.computer import IntcodeComputer, Opcode, LENGTHS, parse_opcode
+
+
+def disassemble(memory: Sequence[int], pos: int) -> str:
+    """
+    One instruction as text: position-mode parameters in [brackets],
+    relative-mode ones as [rb+offset], immediates bare.
+    """
+    instruction = memory[pos] if pos < len(memory) else 0
+    if instruction % 100 not in LENGTHS:
+        return f"DATA {instruction}"
+
+    opcode, modes = parse_opcode(instruction)
+    params = []
+    for i in range(1, LENGTHS[opcode.value]):
+        arg = memory[pos + i] if pos + i < len(memory) else 0
+        mode = modes[i - 1]
+        if mode == 0:
+            params.append(f"[{arg}]")
+        elif mode == 1:
+            params.append(str(arg))
+        elif mode == 2:
+            params.append(f"[rb{arg:+d}]")
+        else:
+            return f"DATA {instruction}"
+    if not params:
+        return opcode.name
+    return f"{opcode.name} {', '.join(params)}"
+
+
+class Profile:
+    def __init__(self) -> None:
+        self.opcodes: CounterType[int] = Counter()
+        self.addresses: CounterType[int] = Counter()
+        # jump address -> [times taken, times not taken]
+        self.jumps: Dict[int, List[int]] = {}
+        # seconds
+        self.executing = 0.0
+        self.blocked = 0.0
+
+    @property
+    def instructions(self) -> int:
+        return sum(self.opcodes.values())
+
+    def go(self, computer: IntcodeComputer) -> int:
+        """
+        IntcodeComputer.go(), counting as it goes
+        """
+        opcodes = self.opcodes
+        addresses = self.addresses
+        jumps = self.jumps
+        clock = time.perf_counter
+        blocked = 0.0
+        start = clock()
+
+        try:
+            while True:
+                pos = computer.pos
+                entry = computer._decoded.get(pos)
+                if entry is None:
+                    entry = computer._decode(pos)
+                opcode, _, mode1, arg1 = entry[:4]
+
+                if opcode == 3:
+                    # nearly all of an input instruction is get_input()
+                    waited = clock()
+                    try:
+                        computer.step()
+                    finally:
+                        blocked += clock() - waited
+                    opcodes[3] += 1
+                    addresses[pos] += 1
+                    continue
+
+                if opcode == 5 or opcode == 6:
+                    taken = (computer._value(mode1, arg1) != 0) == (opcode == 5)
+                    jumps.setdefault(pos, [0, 0])[0 if taken else 1] += 1
+
+                opcodes[opcode] += 1
+                addresses[pos] += 1
+                output = computer.step()
+                if output is not None:
+                    return output
+        finally:
+            self.blocked += blocked
+            self.executing += clock() - start - blocked
+
+    def report(self, memory: Sequence[int], top: int = 20) -> str:
+        """
+        totals, instructions per opcode, and the top hottest addresses
+        disassembled from memory
+        """
+        total = self.instructions or 1
+        lines = [f"{self.instructions} instructions, {self.executing:.3f}s executing, "
+                 f"{self.blocked:.3f}s blocked on input"]
+
+        lines.append("")
+        for opcode, count in self.opcodes.most_common():
+            lines.append(f"{Opcode(opcode).name:>22} {count:>12} {count / total:>7.1%}")
+
+        lines.append("")
+        for pos, count in self.addresses.most_common(top):
+            line = f"{pos:>8} {count:>12} {count / total:>7.1%}  {disassemble(memory, pos)}"
+            if pos in self.jumps:
+                taken, not_taken = self.jumps[pos]
+                line += f"  (taken {taken}, not taken {not_taken})"
+            lines.append(line)
+
+        return "\n".join(lines)
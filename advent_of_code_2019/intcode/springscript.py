@@ -0,0 +1,393 @@
+"""
+Search for springscript programs (day 21) instead of writing them by hand.
+
+    script, damage = search(program, "RUN")
+
+The search is counterexample-guided. It keeps the hulls the springdroid
+has fallen into so far, and finds short springscripts that get a droid
+across all of them. Those scripts are tried on the real Intcode
+program, in parallel. The first that comes back with the hull damage
+wins; every one that falls adds the hull it fell into, and the search
+goes round again.
+
+Finding scripts doesn't run Intcode. Each way across a known hull says
+which sensor readings J must be true on (where the droid jumps) and false
+on (where it walks). Registers are truth tables over the readings seen,
+bit k for the k-th, so checking a script against them is a few bitwise
+operations. Scripts are enumerated as ANDs of clauses, each an OR of up to
+max_literals sensors, plain or negated. Clauses are combinations, not
+orderings, and a clause is never used when a clause made of some of its
+literals would do. An AND that is too long for max_instructions is cut
+off as soon as its cost passes the best found. The Intcode program is run
+once up to its "Input instructions:" prompt and every attempt starts
+from that snapshot, on workers that last the whole search.
+
+    python -m intcode.springscript input.txt [WALK|RUN]
+    python day21.py --search
+"""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+import itertools
+import os
+import sys
+
+from intcode.ascii import Terminal
+from intcode.computer import IntcodeComputer, Program, Snapshot
+from intcode.sweep import Sweeper
+
+
+SENSORS = {"WALK": "ABCD", "RUN": "ABCDEFGHI"}
+
+# how far a jump carries the droid
+JUMP = 4
+
+# what the droid prints before its last moments, and what they're drawn in
+FELL = "Didn't make it across:"
+HULL = set(".#@")
+
+# the most a script saves on the sum of its clauses' costs: up to 2 for the
+# clause built in J, which starts false and needs no AND, and 1 for the
+# first clause built in T, which starts false too
+SAVING = 3
+
+# a sensor, plain (True) or negated; a clause is an OR of literals
+Literal = Tuple[str, bool]
+Clause = Tuple[Literal, ...]
+
+
+def prompt(program: Program) -> Snapshot:
+    """
+    the program's state once it is waiting for a springscript
+    """
+    terminal = Terminal(IntcodeComputer(program))
+    text = terminal.read()
+    if not text.endswith("Input instructions:\n"):
+        raise ValueError(f"not a springscript prompt: {text!r}")
+    return terminal.computer.snapshot()
+
+
+def attempt(snapshot: Snapshot, script: str) -> Tuple[Optional[int], Optional[str]]:
+    """
+    run one script from the prompt. Returns (hull damage, None) if the
+    droid made it across, otherwise (None, the hull it fell into)
+    """
+    terminal = Terminal(IntcodeComputer.from_snapshot(snapshot))
+    terminal.write(script)
+    text = terminal.read()
+    if terminal.values:
+        return terminal.values[-1], None
+    return None, fallen_into(text)
+
+
+def fallen_into(text: str) -> str:
+    """
+    the hull in the droid's report of its fall: the ground is the bottom
+    row of each frame, and the first frame after the message has the droid
+    at its left edge
+    """
+    if FELL not in text:
+        raise ValueError(f"neither hull damage nor a fall: {text!r}")
+    for frame in text.split(FELL, 1)[1].split("\n\n"):
+        rows = frame.strip("\n").split("\n")
+        if rows[0] and all(set(row) <= HULL for row in rows):
+            return rows[-1]
+    raise ValueError(f"no frames after the fall: {text!r}")
+
+
+def reading(hull: str, pos: int, sensors: str) -> int:
+    """
+    the droid's sensors at pos, as a bitmask (A is bit 0); beyond the end
+    of the hull is ground
+    """
+    bits = 0
+    for i in range(len(sensors)):
+        if pos + 1 + i >= len(hull) or hull[pos + 1 + i] == "#":
+            bits |= 1 << i
+    return bits
+
+
+class Synthesiser:
+    """
+    Scripts over the sensor readings seen on a fixed set of hulls.
+    """
+    def __init__(self, hulls: List[str], sensors: str, max_literals: int = 4) -> None:
+        self.hulls = hulls
+        self.sensors = sensors
+        # every reading a droid can take on the known hulls, numbered
+        self.readings: Dict[int, int] = {}
+        for hull in hulls:
+            for pos in range(len(hull)):
+                self.readings.setdefault(reading(hull, pos, sensors), len(self.readings))
+        self.mask = (1 << len(self.readings)) - 1
+
+        # the truth table of each sensor's literal, plain and negated
+        self.literals: Dict[Literal, int] = {}
+        for i, sensor in enumerate(sensors):
+            table = sum(1 << k for bits, k in self.readings.items() if bits >> i & 1)
+            self.literals[(sensor, True)] = table
+            self.literals[(sensor, False)] = ~table & self.mask
+
+        # every clause of up to max_literals different sensors, smallest
+        # first, with its truth table and what ANDing it into J costs
+        self._clauses: List[Tuple[Clause, int, int]] = []
+        for size in range(1, max_literals + 1):
+            for chosen in itertools.combinations(sensors, size):
+                for signs in itertools.product((True, False), repeat=size):
+                    clause = tuple(zip(chosen, signs))
+                    table = 0
+                    for literal in clause:
+                        table |= self.literals[literal]
+                    self._clauses.append((clause, table, len(compile_and(clause))))
+
+    def ways_across(self, hull: str) -> List[Tuple[int, int]]:
+        """
+        every way across hull as (readings J must be true on, readings J
+        must be false on), dropping ways that need both for one reading
+        """
+        readings = self.readings
+        ways = []
+
+        def walk(pos: int, jump: int, stay: int) -> None:
+            if pos >= len(hull):
+                ways.append((jump, stay))
+                return
+            if hull[pos] != "#":
+                return
+            bit = 1 << readings[reading(hull, pos, self.sensors)]
+            if not stay & bit:
+                walk(pos + JUMP, jump | bit, stay)
+            if not jump & bit:
+                walk(pos + 1, jump, stay | bit)
+
+        walk(0, 0, 0)
+        return ways
+
+    def clauses(self, jump: int, stay: int) -> List[Tuple[Clause, int, int]]:
+        """
+        clauses (ORs of literals) true on every reading in jump, with the
+        readings in stay each makes false and its cost. A clause with a
+        sub-clause that qualifies is left out: the sub-clause is cheaper
+        and false on more.
+        """
+        found = []
+        qualified = set()
+        for clause, table, cost in self._clauses:
+            if table & jump != jump or not stay & ~table:
+                continue
+            if any(frozenset(smaller) in qualified
+                   for size in range(1, len(clause))
+                   for smaller in itertools.combinations(clause, size)):
+                continue
+            qualified.add(frozenset(clause))
+            found.append((clause, stay & ~table, cost))
+        return found
+
+    def cover(self, jump: int, stay: int, max_instructions: int) -> Optional[List[Clause]]:
+        """
+        the cheapest AND of clauses that is true on jump and false on stay:
+        every reading in stay has to be made false by some clause. Branches
+        on the clauses that make the first uncovered reading false, so each
+        set of clauses is tried in one order only.
+        """
+        candidates = self.clauses(jump, stay)
+        best: List[Optional[List[Clause]]] = [None]
+        best_cost = [max_instructions + 1]
+
+        def extend(chosen: List[Clause], cost: int, uncovered: int) -> None:
+            if max(1, cost - SAVING) >= best_cost[0]:
+                return
+            if not uncovered:
+                length = len(compile_cnf(chosen))
+                if length < best_cost[0]:
+                    best[0], best_cost[0] = list(chosen), length
+                return
+            first = uncovered & -uncovered
+            for clause, falsified, clause_cost in candidates:
+                if falsified & first:
+                    chosen.append(clause)
+                    extend(chosen, cost + clause_cost, uncovered & ~falsified)
+                    chosen.pop()
+
+        extend([], 0, stay)
+        return best[0]
+
+    def table(self, cnf: List[Clause]) -> int:
+        table = self.mask
+        for clause in cnf:
+            clause_table = 0
+            for literal in clause:
+                clause_table |= self.literals[literal]
+            table &= clause_table
+        return table
+
+    def scripts(self, max_instructions: int) -> Iterator[List[str]]:
+        """
+        scripts that get the droid across every known hull.
+
+        One way across is chosen per hull, depth first, hulls with the
+        fewest ways first. After each choice the requirements so far need a
+        cover; the one found for the choices before is kept if it still
+        fits, so most choices cost a table check rather than a search, and
+        a choice with no cover cuts off everything below it.
+        """
+        ways = []
+        for hull in self.hulls:
+            hull_ways = self.ways_across(hull)
+            # a way needing everything another way needs (and more) is no
+            # easier to satisfy
+            ways.append([(jump, stay) for jump, stay in hull_ways
+                         if not any(other != (jump, stay) and other[0] & jump == other[0] and other[1] & stay == other[1]
+                                    for other in hull_ways)])
+        ways.sort(key=len)
+        seen = set()
+
+        def choose(i: int, jump: int, stay: int, table: int) -> Iterator[List[str]]:
+            if i == len(ways):
+                script = compile_cnf(self.cover(jump, stay, max_instructions))
+                if tuple(script) not in seen:
+                    seen.add(tuple(script))
+                    yield script
+                return
+            for way_jump, way_stay in ways[i]:
+                new_jump, new_stay = jump | way_jump, stay | way_stay
+                if new_jump & new_stay:
+                    continue
+                new_table = table
+                if new_table & new_jump != new_jump or new_table & new_stay:
+                    cnf = self.cover(new_jump, new_stay, max_instructions)
+                    if cnf is None:
+                        continue
+                    new_table = self.table(cnf)
+                yield from choose(i + 1, new_jump, new_stay, new_table)
+
+        return choose(0, 0, 0, self.mask)
+
+
+def compile_clause(clause: Clause, register: str, empty: bool = False) -> List[str]:
+    """
+    springscript leaving clause in register, which may hold anything, or
+    is false if empty. OR can only add a plain sensor and AND only a plain
+    sensor to a negated clause, so the register flips between holding the
+    clause and holding its negation; the literals are ordered to flip as
+    little as possible.
+    """
+    positive = [sensor for sensor, plain in clause if plain]
+    negative = [sensor for sensor, plain in clause if not plain]
+    orders = []
+    if positive:
+        orders.append([(positive[0], True)] + [(s, False) for s in negative] + [(s, True) for s in positive[1:]])
+    if negative:
+        orders.append([(negative[0], False)] + [(s, True) for s in positive] + [(s, False) for s in negative[1:]])
+
+    best = None
+    for order in orders:
+        (sensor, plain), rest = order[0], order[1:]
+        if empty and plain:
+            # OR X into false leaves X: the clause itself
+            script = [f"OR {sensor} {register}"]
+            negated = False
+        else:
+            # NOT X leaves !X: the negation of a clause starting X, or the
+            # clause itself if it starts !X
+            script = [f"NOT {sensor} {register}"]
+            negated = plain
+        for sensor, plain in rest:
+            if plain == negated:
+                script.append(f"NOT {register} {register}")
+                negated = not negated
+            script.append(f"OR {sensor} {register}" if plain else f"AND {sensor} {register}")
+        if negated:
+            script.append(f"NOT {register} {register}")
+        if best is None or len(script) < len(best):
+            best = script
+    return best
+
+
+def compile_and(clause: Clause, empty: bool = False) -> List[str]:
+    """
+    springscript ANDing clause into J: a plain sensor directly, anything
+    else built in T (false if empty) first
+    """
+    if len(clause) == 1 and clause[0][1]:
+        return [f"AND {clause[0][0]} J"]
+    return compile_clause(clause, "T", empty) + ["AND T J"]
+
+
+def compile_cnf(cnf: List[Clause]) -> List[str]:
+    """
+    springscript setting J to the AND of the clauses. J and T both start
+    false: one clause is built in J itself, whichever that saves most on,
+    and the rest are ANDed in, the one that gains most from T being
+    false first.
+    """
+    if not cnf:
+        return ["NOT J J"]
+
+    def gain(clause: Clause) -> int:
+        return len(compile_and(clause, True)) - len(compile_and(clause))
+
+    best = None
+    for i, first in enumerate(cnf):
+        script = compile_clause(first, "J", empty=True)
+        empty = True
+        for clause in sorted(cnf[:i] + cnf[i + 1:], key=gain):
+            instructions = compile_and(clause, empty)
+            script += instructions
+            empty = empty and len(instructions) == 1
+        if best is None or len(script) < len(best):
+            best = script
+    return best
+
+
+def search(program: Program,
+           mode: str = "WALK",
+           max_instructions: int = 15,
+           max_literals: int = 4,
+           workers: Optional[int] = None) -> Tuple[str, int]:
+    """
+    a springscript that gets the droid across in this mode (WALK or RUN),
+    and the hull damage it reports. Each round tries one candidate per
+    worker.
+    """
+    workers = workers or os.cpu_count() or 1
+    snapshot = prompt(program)
+    sensors = SENSORS[mode]
+    hulls: List[str] = []
+
+    def reducer(found, script, result):
+        damage, hull = result
+        if damage is not None:
+            return script, damage
+        if hull not in hulls:
+            hulls.append(hull)
+        return found
+
+    # the workers start from the prompt; only scripts and results go back
+    # and forth after that
+    with Sweeper(snapshot, attempt, workers) as sweeper:
+        while True:
+            candidates = []
+            for script in Synthesiser(hulls, sensors, max_literals).scripts(max_instructions):
+                candidates.append("\n".join(script + [mode]) + "\n")
+                if len(candidates) == workers:
+                    break
+            if not candidates:
+                raise RuntimeError(f"no {mode} script of up to {max_instructions} instructions")
+
+            found = sweeper.sweep(candidates, reducer,
+                                  until=lambda found: found is not None,
+                                  chunk_size=1)
+            if found is not None:
+                return found
+
+
+def main(path: str, mode: str = "WALK") -> None:
+    with open(path) as f:
+        program = [int(n) for n in f.read().strip().split(",")]
+    script, damage = search(program, mode)
+    print(script, end="")
+    print(damage)
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:3])
@@ -0,0 +1,192 @@
+"""
+Spread a search over Intcode inputs across processes.
+
+    sweep(program, input_space, reducer)
+
+cuts input_space into chunks and runs them on a ProcessPoolExecutor, one
+worker per core by default. Each worker is handed the program image (or
+a snapshot, for an evaluate that starts from one) once, when it starts;
+after that only chunks of items and their results cross the process
+boundary. Results stream back as chunks finish and are folded
+into an accumulator in the parent with reducer(accumulator, item, result),
+so the reducer should not care about order. As soon as until(accumulator)
+is true the sweep stops and drops every chunk that hasn't started.
+
+A search that sweeps the same program round after round keeps one set of
+workers with Sweeper instead of starting a pool per round:
+
+    with Sweeper(program, evaluate) as sweeper:
+        while ...:
+            sweeper.sweep(input_space, reducer)
+
+evaluate(program, item) -> result runs in the workers. The evaluators
+below take their computers from a Pool (intcode.pool) that each worker
+keeps for its program, so an item costs a reset of the pages the last one
+wrote rather than a fresh copy of the program. Workers are forked
+where the platform allows it; elsewhere they are spawned, and evaluate
+must then be importable (the ones below are) and the calling script needs
+an `if __name__ == "__main__":` guard.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import itertools
+import multiprocessing
+import os
+
+from intcode.computer import EndProgram, Program, Snapshot
+from intcode.pool import Pool
+
+
+# what the workers are handed: the evaluators below take a program
+Image = Union[Program, Snapshot]
+Evaluate = Callable[[Image, Any], Any]
+
+
+def outputs(program: Program, inputs: Sequence[int]) -> List[int]:
+    """
+    the item is the program's input; the result is everything it outputs
+    """
+    outputs = []
+    with _pool(program).computer() as computer:
+        computer.inputs.extend(inputs)
+        try:
+            while True:
+                outputs.append(computer.go())
+        except EndProgram:
+            return outputs
+
+
+def patched_result(program: Program, patch: Dict[int, int]) -> int:
+    """
+    the item overwrites some addresses before the run (day 2's noun and
+    verb); the result is what's left at address 0 once the program halts
+    """
+    with _pool(program).computer() as computer:
+        for loc, value in patch.items():
+            computer._write(loc, value)
+        try:
+            while True:
+                computer.go()
+        except EndProgram:
+            return computer.memory[0]
+
+
+def amplifier_chain(program: Program, phases: Sequence[int]) -> int:
+    """
+    the item is a phase setting per amplifier (day 7); the result is the
+    signal out of the last amplifier
+    """
+    signal = 0
+    for phase in phases:
+        signal, = outputs(program, [phase, signal])
+    return signal
+
+
+_program: Optional[Image] = None
+_evaluate: Optional[Evaluate] = None
+_program_pool: Optional[Pool] = None
+
+
+def _start_worker(program: Image, evaluate: Evaluate) -> None:
+    global _program, _evaluate, _program_pool
+    _program = program
+    _evaluate = evaluate
+    _program_pool = None
+
+
+def _pool(program: Program) -> Pool:
+    """
+    in a worker, the pool for the program it was handed (made on first
+    use); anywhere else a one-off pool, since the caller's list may have
+    changed since last time
+    """
+    global _program_pool
+    if program is not _program:
+        return Pool(program)
+    if _program_pool is None:
+        _program_pool = Pool(program)
+    return _program_pool
+
+
+def _run_chunk(chunk: List[Any]) -> List[Any]:
+    return [(item, _evaluate(_program, item)) for item in chunk]
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    items = iter(items)
+    while True:
+        chunk = list(itertools.islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Sweeper:
+    """
+    A process pool whose workers hold one program and evaluate, for any
+    number of sweeps over it. Shut it down with close(), or use it as a
+    context manager.
+    """
+    def __init__(self,
+                 program: Image,
+                 evaluate: Evaluate = outputs,
+                 workers: Optional[int] = None) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+        self._executor = ProcessPoolExecutor(self.workers,
+                                             mp_context=context,
+                                             initializer=_start_worker,
+                                             initargs=(program, evaluate))
+
+    def sweep(self,
+              input_space: Iterable[Any],
+              reducer: Callable[[Any, Any, Any], Any],
+              initial: Any = None,
+              until: Optional[Callable[[Any], bool]] = None,
+              chunk_size: int = 64) -> Any:
+        executor = self._executor
+        chunks = _chunks(input_space, chunk_size)
+        accumulator = initial
+
+        # keep a couple of chunks per worker in flight, so a huge (or
+        # endless) input space is only pulled as fast as it's consumed
+        pending = {executor.submit(_run_chunk, chunk)
+                   for chunk in itertools.islice(chunks, 2 * self.workers)}
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for item, result in future.result():
+                        accumulator = reducer(accumulator, item, result)
+                        if until is not None and until(accumulator):
+                            return accumulator
+                    chunk = next(chunks, None)
+                    if chunk is not None:
+                        pending.add(executor.submit(_run_chunk, chunk))
+            return accumulator
+        finally:
+            # chunks that haven't started are dropped; the workers stay
+            for future in pending:
+                future.cancel()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "Sweeper":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def sweep(program: Image,
+          input_space: Iterable[Any],
+          reducer: Callable[[Any, Any, Any], Any],
+          initial: Any = None,
+          evaluate: Evaluate = outputs,
+          until: Optional[Callable[[Any], bool]] = None,
+          workers: Optional[int] = None,
+          chunk_size: int = 64) -> Any:
+    with Sweeper(program, evaluate, workers) as sweeper:
+        return sweeper.sweep(input_space, reducer, initial, until, chunk_size)